@@ -1,99 +1,18 @@
 # apps/categories/views.py
-from django.contrib.auth.decorators import login_required
-from django.contrib import messages
-import sqlite3
-from django.conf import settings
-from django.shortcuts import render, redirect, get_object_or_404
-from django.utils import timezone
+from core.crud import StockCreateView, StockDeleteView, StockListView, StockUpdateView
 from .models import StockItemCategories
 from .forms import StockItemCategoriesForm
 
-DB_PATH = settings.BASE_DIR / 'db.sqlite3'
+VIEW_OPTIONS = {'model': StockItemCategories, 'label': 'Category', 'noun': 'categories'}
 
 
-@login_required
-def index(request):
-    # --- Get logged-in user's primary group ---
-    user_groups = request.user.groups.values_list('name', flat=True)
-    user_group = user_groups[0] if user_groups else None
+class StockItemCategoriesListView(StockListView):
+    model = StockItemCategories
+    title = 'Stock Items Categories List'
+    query_budget = 4  # session, user, count, page
 
-    # --- List all stock* tables for display only ---
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name LIKE 'stock%'")
-    tables = [row[0] for row in cursor.fetchall()]
-    conn.close()
 
-    # --- Fetch all StockItemCategories records ---
-    records = StockItemCategories.objects.all().order_by('id')
-
-    return render(request, 'categories/index.html', {
-        'title': 'Stock Items Categories List',
-        'records': records,
-        'tables': tables,
-        'current_table': 'stock_items_categories',
-        'user_group': user_group,  # pass group to template
-    })
-
-
-@login_required
-def add_record(request):
-    # Users group cannot add
-    if not (request.user.is_superuser or request.user.groups.filter(name='Admin').exists()):
-        messages.warning(request, "You do not have permission to add categories.")
-        return redirect('categories:index')
-
-    if request.method == 'POST':
-        form = StockItemCategoriesForm(request.POST)
-        if form.is_valid():
-            record = form.save(commit=False)
-            now = timezone.now()
-            record.created_at = now
-            record.updated_at = now
-            record.save()
-            return redirect('categories:index')
-    else:
-        form = StockItemCategoriesForm()
-
-    return render(request, 'categories/form.html', {
-        'title': 'Add Category',
-        'form': form,
-    })
-
-
-@login_required
-def update_record(request, pk):
-    record = get_object_or_404(StockItemCategories, pk=pk)
-
-    # Users group cannot edit
-    if not (request.user.is_superuser or request.user.groups.filter(name='Admin').exists()):
-        messages.warning(request, "You do not have permission to edit categories.")
-        return redirect('categories:index')
-
-    if request.method == 'POST':
-        form = StockItemCategoriesForm(request.POST, instance=record)
-        if form.is_valid():
-            updated = form.save(commit=False)
-            updated.updated_at = timezone.now()
-            updated.save()
-            return redirect('categories:index')
-    else:
-        form = StockItemCategoriesForm(instance=record)
-
-    return render(request, 'categories/form.html', {
-        'title': f'Update Category ID {record.id}',
-        'form': form,
-    })
-
-
-@login_required
-def delete_record(request, pk):
-    record = get_object_or_404(StockItemCategories, pk=pk)
-
-    # Users group cannot delete
-    if not (request.user.is_superuser or request.user.groups.filter(name='Admin').exists()):
-        messages.warning(request, "You do not have permission to delete categories.")
-        return redirect('categories:index')
-
-    record.delete()
-    return redirect('categories:index')
+index = StockItemCategoriesListView.as_view()
+add_record = StockCreateView.as_view(form_class=StockItemCategoriesForm, **VIEW_OPTIONS)
+update_record = StockUpdateView.as_view(form_class=StockItemCategoriesForm, **VIEW_OPTIONS)
+delete_record = StockDeleteView.as_view(**VIEW_OPTIONS)
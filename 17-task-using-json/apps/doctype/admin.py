@@ -1,5 +1,6 @@
 # apps/doctype/admin.py
 from django.contrib import admin
+from apps.users.roles import ADMIN, has_role
 from .models import StockDocType
 
 class StockDocTypeAdmin(admin.ModelAdmin):
@@ -14,23 +15,23 @@ class StockDocTypeAdmin(admin.ModelAdmin):
 
     # Permissions based on group
     def get_readonly_fields(self, request, obj=None):
-        if request.user.groups.filter(name='Admin').exists():
+        if has_role(request.user, ADMIN):
             return self.readonly_fields  # Admin sees only system read-only fields
         # Users group → everything read-only (should not see table anyway)
         return ('id', 'name', 'description', 'status', 'created_at', 'updated_at')
 
     def has_add_permission(self, request):
-        return request.user.groups.filter(name='Admin').exists()
+        return has_role(request.user, ADMIN)
 
     def has_change_permission(self, request, obj=None):
-        return request.user.groups.filter(name='Admin').exists()
+        return has_role(request.user, ADMIN)
 
     def has_delete_permission(self, request, obj=None):
-        return request.user.groups.filter(name='Admin').exists()
+        return has_role(request.user, ADMIN)
 
     def has_view_permission(self, request, obj=None):
         # Only Admins can view this table
-        return request.user.groups.filter(name='Admin').exists()
+        return has_role(request.user, ADMIN)
 
 
 # Register the model
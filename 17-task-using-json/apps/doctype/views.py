@@ -1,99 +1,18 @@
 # apps/doctype/views.py
-from django.contrib.auth.decorators import login_required
-from django.contrib import messages
-import sqlite3
-from django.conf import settings
-from django.shortcuts import render, redirect, get_object_or_404
-from django.utils import timezone
+from core.crud import StockCreateView, StockDeleteView, StockListView, StockUpdateView
 from .models import StockDocType
 from .forms import StockDocTypeForm
 
-DB_PATH = settings.BASE_DIR / 'db.sqlite3'
+VIEW_OPTIONS = {'model': StockDocType, 'label': 'Document Type', 'noun': 'document types'}
 
 
-@login_required
-def index(request):
-    # --- Get logged-in user's primary group ---
-    user_groups = request.user.groups.values_list('name', flat=True)
-    user_group = user_groups[0] if user_groups else None
+class StockDocTypeListView(StockListView):
+    model = StockDocType
+    title = 'Stock Document Type List'
+    query_budget = 4  # session, user, count, page
 
-    # --- List all stock* tables for display only ---
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name LIKE 'stock%'")
-    tables = [row[0] for row in cursor.fetchall()]
-    conn.close()
 
-    # --- Fetch all StockDocType records ---
-    records = StockDocType.objects.all().order_by('id')
-
-    return render(request, 'doctype/index.html', {
-        'title': 'Stock Document Type List',
-        'records': records,
-        'tables': tables,
-        'current_table': 'stock_document_type',
-        'user_group': user_group,
-    })
-
-
-@login_required
-def add_record(request):
-    # Users group cannot add
-    if not (request.user.is_superuser or request.user.groups.filter(name='Admin').exists()):
-        messages.warning(request, "You do not have permission to add document types.")
-        return redirect('doctype:index')
-
-    if request.method == 'POST':
-        form = StockDocTypeForm(request.POST)
-        if form.is_valid():
-            record = form.save(commit=False)
-            now = timezone.now()
-            record.created_at = now
-            record.updated_at = now
-            record.save()
-            return redirect('doctype:index')
-    else:
-        form = StockDocTypeForm()
-
-    return render(request, 'doctype/form.html', {
-        'title': 'Add Document Type',
-        'form': form,
-    })
-
-
-@login_required
-def update_record(request, pk):
-    record = get_object_or_404(StockDocType, pk=pk)
-
-    # Users group cannot edit
-    if not (request.user.is_superuser or request.user.groups.filter(name='Admin').exists()):
-        messages.warning(request, "You do not have permission to edit document types.")
-        return redirect('doctype:index')
-
-    if request.method == 'POST':
-        form = StockDocTypeForm(request.POST, instance=record)
-        if form.is_valid():
-            updated = form.save(commit=False)
-            updated.updated_at = timezone.now()
-            updated.save()
-            return redirect('doctype:index')
-    else:
-        form = StockDocTypeForm(instance=record)
-
-    return render(request, 'doctype/form.html', {
-        'title': f'Update Document Type ID {record.id}',
-        'form': form,
-    })
-
-
-@login_required
-def delete_record(request, pk):
-    record = get_object_or_404(StockDocType, pk=pk)
-
-    # Users group cannot delete
-    if not (request.user.is_superuser or request.user.groups.filter(name='Admin').exists()):
-        messages.warning(request, "You do not have permission to delete document types.")
-        return redirect('doctype:index')
-
-    record.delete()
-    return redirect('doctype:index')
+index = StockDocTypeListView.as_view()
+add_record = StockCreateView.as_view(form_class=StockDocTypeForm, **VIEW_OPTIONS)
+update_record = StockUpdateView.as_view(form_class=StockDocTypeForm, **VIEW_OPTIONS)
+delete_record = StockDeleteView.as_view(**VIEW_OPTIONS)
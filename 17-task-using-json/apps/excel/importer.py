@@ -0,0 +1,212 @@
+# apps/excel/importer.py
+"""
+Bulk import of stock movements from an uploaded .xlsx or .csv sheet.
+
+- The sheet is streamed: openpyxl `read_only=True` (or csv.reader), one row at a time.
+- Item codes and document type names are resolved through two dicts built
+  once per import, not one query per row.
+- Valid rows are inserted with bulk_create in batches of N rows, one
+  transaction per batch (balances included, see apps.movements.posting).
+- Every rejected row is reported with its sheet row number and the reason.
+- A failure partway (unreadable bytes, a database error) ends the import
+  but not the report: committed batches stay, and report.stopped gives the
+  sheet row to resume from.
+
+The first row must be a header. Recognised columns (case-insensitive):
+item_code, document_type, document_number, document_reference, quantity,
+movement_date, status.
+"""
+import csv
+import io
+from datetime import date, datetime, time
+
+from django.conf import settings
+from django.utils import timezone
+from openpyxl import load_workbook
+
+from apps.doctype.models import StockDocType
+from apps.items.models import StockItems
+from apps.movements.models import StockMovements
+from apps.movements.periods import last_closed_period
+from apps.movements.posting import as_int, insert_movements, parse_moment
+
+# Header spellings accepted for each StockMovements field
+COLUMN_ALIASES = {
+    'item_code': ['item_code', 'item', 'code'],
+    'document_type': ['document_type', 'doc_type', 'doctype'],
+    'document_number': ['document_number', 'doc_number', 'number'],
+    'document_reference': ['document_reference', 'reference'],
+    'quantity': ['quantity', 'qty'],
+    'movement_date': ['movement_date', 'date'],
+    'status': ['status'],
+}
+
+REQUIRED_COLUMNS = ['item_code', 'document_type', 'document_number', 'quantity']
+
+
+class ImportReport:
+
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.errors = []  # [{'row': n, 'error': msg}, ...]
+        self.stopped = None  # {'row': n, 'error': msg}: the import broke off, rows from n on were not imported
+
+    def error(self, row, message):
+        self.errors.append({'row': row, 'error': message})
+
+    def stop(self, row, message):
+        self.stopped = {'row': row, 'error': message}
+
+
+def read_rows(upload, filename):
+    """Yield (sheet row number, tuple of cell values), header first."""
+    if filename.lower().endswith('.csv'):
+        text = io.TextIOWrapper(upload, encoding='utf-8-sig', newline='')
+        for number, row in enumerate(csv.reader(text), start=1):
+            yield number, tuple(row)
+        return
+
+    wb = load_workbook(filename=upload, read_only=True, data_only=True)
+    try:
+        ws = wb.active  # first sheet
+        for number, row in enumerate(ws.iter_rows(values_only=True), start=1):
+            yield number, row
+    finally:
+        wb.close()  # read-only workbooks keep the file open until closed
+
+
+def map_header(header):
+    """{field: column index} from the header row."""
+    names = [str(cell).strip().lower() if cell is not None else '' for cell in header]
+    columns = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in names:
+                columns[field] = names.index(alias)
+                break
+    return columns
+
+
+def to_int(value):
+    # Excel numbers come back as floats (5.0); text is parsed exactly, never through float()
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return as_int(value)  # 64-bit range checked
+
+
+def as_key(value):
+    # Codes typed as numbers come back from Excel as 1001.0
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+
+def to_moment(value):
+    if value in (None, ''):
+        return timezone.now()
+    if isinstance(value, datetime):
+        return value if timezone.is_aware(value) else timezone.make_aware(value)
+    if isinstance(value, date):
+        return timezone.make_aware(datetime.combine(value, time.min))
+    try:
+        return parse_moment(str(value).strip())
+    except ValueError:
+        return None  # Well-formed but impossible, e.g. 2025-02-30: reported with the row
+
+
+def import_movements(upload, filename, batch_size=None):
+    batch_size = batch_size or settings.EXCEL_IMPORT_BATCH_SIZE
+    report = ImportReport()
+    rows = read_rows(upload, filename)
+
+    header = next(rows, None)
+    if header is None:
+        report.error(1, 'The sheet is empty.')
+        return report
+
+    columns = map_header(header[1])
+    missing = [field for field in REQUIRED_COLUMNS if field not in columns]
+    if missing:
+        report.error(header[0], f"Missing column(s): {', '.join(missing)}.")
+        return report
+
+    # One query per lookup table for the whole import
+    items = dict(StockItems.objects.values_list('code', 'id'))
+    doctypes = dict(StockDocType.objects.values_list('name', 'id'))
+    closed = last_closed_period()
+    statuses = dict(StockMovements.STATUS_CHOICES)
+
+    def cell(row, field):
+        index = columns.get(field)
+        if index is None or index >= len(row):
+            return None
+        value = row[index]
+        return value.strip() if isinstance(value, str) else value
+
+    def take(number, row):
+        """The row's StockMovements, or None (blank line, or reported as rejected)."""
+        if not any(value not in (None, '') for value in row):
+            return None  # Blank line
+        report.rows += 1
+
+        code = as_key(cell(row, 'item_code'))
+        doctype = as_key(cell(row, 'document_type'))
+        document_number = to_int(cell(row, 'document_number'))
+        quantity = to_int(cell(row, 'quantity'))
+        movement_date = to_moment(cell(row, 'movement_date'))
+        status = cell(row, 'status')
+        status = 1 if status in (None, '') else to_int(status)  # Only an empty cell means Active
+
+        problems = []
+        if code not in items:
+            problems.append(f'unknown item code {code!r}')
+        if doctype not in doctypes:
+            problems.append(f'unknown document type {doctype!r}')
+        if document_number is None:
+            problems.append('document_number must be a 64-bit integer')
+        if quantity is None:
+            problems.append('quantity must be a 64-bit integer')
+        if movement_date is None:
+            problems.append('movement_date is not a date')
+        elif closed and movement_date < closed:
+            problems.append(f'movement_date falls in a closed period (before {closed:%Y-%m-%d})')
+        if status not in statuses:
+            problems.append('status must be 1 or 0')
+
+        if problems:
+            message = '; '.join(problems)
+            report.error(number, message[0].upper() + message[1:] + '.')
+            return None
+
+        reference = cell(row, 'document_reference')
+        return StockMovements(
+            item_id=items[code],
+            document_type_id=doctypes[doctype],
+            document_number=document_number,
+            document_reference=str(reference) if reference not in (None, '') else None,
+            quantity=quantity,
+            status=status,
+            movement_date=movement_date,
+        )
+
+    batch, batch_start, next_row = [], None, header[0] + 1
+    try:
+        for number, row in rows:
+            movement = take(number, row)
+            if movement is not None:
+                if not batch:
+                    batch_start = number
+                batch.append(movement)
+            next_row = number + 1
+
+            if len(batch) >= batch_size:
+                report.created += insert_movements(batch)  # One transaction per batch
+                batch = []
+
+        if batch:
+            report.created += insert_movements(batch)
+    except Exception as e:
+        # Earlier batches are committed: report where the import stopped instead of losing the report
+        report.stop(batch_start if batch else next_row, f'{type(e).__name__}: {e}')
+    return report
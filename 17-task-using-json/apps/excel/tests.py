@@ -1,3 +1,114 @@
+# apps/excel/tests.py
+# python manage.py test apps.excel.tests
+from io import BytesIO
+from django.contrib.auth.models import Group, User
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from openpyxl import Workbook
 
-# Create your tests here.
+from apps.doctype.models import StockDocType
+from apps.items.models import StockItems
+from apps.movements.models import StockItemBalances, StockMovements
+from .importer import import_movements
+
+
+class ImportMovementsTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        cls.item = StockItems.objects.create(code='ITEM-1', created_at=now, updated_at=now)
+        StockItems.objects.create(code='1001', created_at=now, updated_at=now)
+        StockDocType.objects.create(name='RECEIPT', created_at=now, updated_at=now)
+
+    def workbook(self, rows):
+        wb = Workbook()
+        for row in rows:
+            wb.active.append(row)
+        buffer = BytesIO()
+        wb.save(buffer)
+        buffer.seek(0)
+        return buffer
+
+    def test_imports_in_batches_and_reports_bad_rows(self):
+        sheet = self.workbook([
+            ['Item_Code', 'Document_Type', 'Document_Number', 'Qty', 'Date'],
+            ['ITEM-1', 'RECEIPT', 1, 5, '2025-11-01'],
+            ['ITEM-1', 'RECEIPT', 1, 3, None],
+            [1001, 'RECEIPT', 2, -1, '2025-11-02 10:00'],
+            ['NOPE', 'RECEIPT', 3, 1, None],
+            ['ITEM-1', 'RECEIPT', 'x', 1.5, None],
+        ])
+
+        report = import_movements(sheet, 'stock.xlsx', batch_size=2)
+
+        self.assertEqual((report.rows, report.created), (5, 3))
+        self.assertEqual([e['row'] for e in report.errors], [5, 6])
+        self.assertIn("'NOPE'", report.errors[0]['error'])
+        self.assertEqual(StockMovements.objects.count(), 3)
+        self.assertEqual(StockItemBalances.objects.get(item=self.item).quantity, 8)
+
+    def test_impossible_date_is_a_row_error(self):
+        sheet = self.workbook([
+            ['item_code', 'document_type', 'document_number', 'quantity', 'movement_date'],
+            ['ITEM-1', 'RECEIPT', 1, 5, '2025-02-28'],
+            ['ITEM-1', 'RECEIPT', 2, 3, '2025-02-30'],
+            ['ITEM-1', 'RECEIPT', 3, 1, '2025-03-01'],
+        ])
+
+        report = import_movements(sheet, 'stock.xlsx', batch_size=1)
+
+        self.assertEqual((report.rows, report.created), (3, 2))
+        self.assertEqual(report.errors, [{'row': 3, 'error': 'Movement_date is not a date.'}])
+
+    def test_bad_status_and_big_numbers(self):
+        sheet = self.workbook([
+            ['item_code', 'document_type', 'document_number', 'quantity', 'status'],
+            ['ITEM-1', 'RECEIPT', '12345678901234567', 1, ''],
+            ['ITEM-1', 'RECEIPT', 2, 1, 'Inactive'],
+            ['ITEM-1', 'RECEIPT', 3, str(2 ** 63), 0],
+        ])
+
+        report = import_movements(sheet, 'stock.xlsx')
+
+        self.assertEqual(report.created, 1)
+        self.assertEqual(report.errors, [
+            {'row': 3, 'error': 'Status must be 1 or 0.'},
+            {'row': 4, 'error': 'Quantity must be a 64-bit integer.'},
+        ])
+        movement = StockMovements.objects.get()
+        self.assertEqual((movement.document_number, movement.status), (12345678901234567, 1))
+
+    def test_csv_upload_view(self):
+        admin = User.objects.create_user('admin', password='root')
+        admin.groups.add(Group.objects.create(name='Admin'))
+        self.client.force_login(admin)
+
+        upload = SimpleUploadedFile('stock.csv', b'item_code,document_type,document_number,quantity\nITEM-1,RECEIPT,7,4\n')
+        response = self.client.post(reverse('excel:import'), {'sheet': upload})
+
+        self.assertEqual(response.context['report'].created, 1)
+        self.assertContains(response, '1 of 1 row(s) imported')
+
+    def test_failure_partway_keeps_the_report(self):
+        admin = User.objects.create_user('admin', password='root')
+        admin.groups.add(Group.objects.create(name='Admin'))
+        self.client.force_login(admin)
+
+        lines = b''.join(b'ITEM-1,RECEIPT,%d,1\n' % n for n in range(2000))
+        upload = SimpleUploadedFile('stock.csv', b'item_code,document_type,document_number,quantity\n' + lines + b'\xff\n')
+        response = self.client.post(reverse('excel:import'), {'sheet': upload, 'batch_size': 100})
+
+        report = response.context['report']
+        self.assertGreater(report.created, 0)
+        self.assertEqual(report.created, StockMovements.objects.count())
+        self.assertEqual(report.stopped['row'], report.created + 2)  # Header, then every imported row
+        self.assertIn('UnicodeDecodeError', report.stopped['error'])
+        self.assertContains(response, f"import again from row {report.stopped['row']} on")
+
+    def test_missing_columns(self):
+        report = import_movements(self.workbook([['code', 'qty']]), 'stock.xlsx')
+        self.assertEqual(report.created, 0)
+        self.assertIn('document_type, document_number', report.errors[0]['error'])
@@ -6,4 +6,5 @@ app_name = 'excel'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('import/', views.import_view, name='import'),  # Stock movements from .xlsx / .csv
 ]
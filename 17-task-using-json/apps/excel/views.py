@@ -1,8 +1,12 @@
 # apps/excel/views.py
-from django.shortcuts import render
+from django.contrib.auth.decorators import login_required
+from django.contrib import messages
+from django.shortcuts import render, redirect
 import os
 from django.conf import settings
 from openpyxl import load_workbook
+from apps.users.roles import is_admin
+from .importer import import_movements
 
 def index(request):
     # /home/user/Public/web/project_folder/data/excel.xlsx
@@ -37,3 +41,35 @@ def index(request):
         }
 
     return render(request, 'excel/index.html', context)
+
+
+@login_required
+def import_view(request):
+    # Users group cannot import
+    if not is_admin(request.user):
+        messages.warning(request, "You do not have permission to import stock movements.")
+        return redirect('excel:index')
+
+    context = {
+        "title": "Import Stock Movements",
+        "batch_size": settings.EXCEL_IMPORT_BATCH_SIZE,
+    }
+
+    if request.method == 'POST':
+        upload = request.FILES.get('sheet')
+        if not upload or not upload.name.lower().endswith(('.xlsx', '.csv')):
+            context["error"] = "Choose an .xlsx or .csv file."
+        else:
+            try:
+                batch_size = int(request.POST.get('batch_size') or settings.EXCEL_IMPORT_BATCH_SIZE)
+            except ValueError:
+                batch_size = settings.EXCEL_IMPORT_BATCH_SIZE
+
+            try:
+                # A failure past the header comes back in report.stopped, with the rows already imported
+                context["report"] = import_movements(upload, upload.name, batch_size=max(batch_size, 1))
+                context["max_errors"] = settings.EXCEL_IMPORT_MAX_ERRORS_SHOWN
+            except Exception as e:
+                context["error"] = f"Failed to read the file: {e}"
+
+    return render(request, 'excel/import.html', context)
@@ -1,14 +1,17 @@
 # apps/items/admin.py
 from django.contrib import admin
 from django.contrib.auth.models import Group
+from apps.users.roles import ADMIN, has_role
+from core.fts import ITEMS, FullTextSearchAdminMixin
 from .models import StockItems
 
-class StockItemsAdmin(admin.ModelAdmin):
+class StockItemsAdmin(FullTextSearchAdminMixin, admin.ModelAdmin):
 
     # System fields always read-only
     readonly_fields = ('id', 'created_at', 'updated_at')
 
     search_fields = ['code', 'description']
+    full_text_search = {'id': ITEMS}  # Searched through stock_items_fts, not LIKE '%term%'
     list_filter = ['status', 'category', 'uom']
     list_display = ['code', 'description', 'category', 'uom', 'status', 'created_at', 'updated_at']
     ordering = ['code']
@@ -16,7 +19,7 @@ class StockItemsAdmin(admin.ModelAdmin):
     # Admin group → full access
     # Users group → no access (model hidden), but we still define checks for safety
     def get_readonly_fields(self, request, obj=None):
-        if request.user.groups.filter(name='Admin').exists():
+        if has_role(request.user, ADMIN):
             return self.readonly_fields  # admin sees only system read-only fields
         return (
             'id', 'code', 'description', 'category', 'uom',
@@ -24,17 +27,17 @@ class StockItemsAdmin(admin.ModelAdmin):
         )
 
     def has_add_permission(self, request):
-        return request.user.groups.filter(name='Admin').exists()
+        return has_role(request.user, ADMIN)
 
     def has_change_permission(self, request, obj=None):
-        return request.user.groups.filter(name='Admin').exists()
+        return has_role(request.user, ADMIN)
 
     def has_delete_permission(self, request, obj=None):
-        return request.user.groups.filter(name='Admin').exists()
+        return has_role(request.user, ADMIN)
 
     def has_view_permission(self, request, obj=None):
         # Only Admins can VIEW this table
-        return request.user.groups.filter(name='Admin').exists()
+        return has_role(request.user, ADMIN)
 
 
 admin.site.register(StockItems, StockItemsAdmin)
@@ -2,22 +2,24 @@
 from django import forms
 from apps.categories.models import StockItemCategories  # Import StockItemCategories
 from apps.uom.models import StockItemUOM  # Import StockItemUOM
+from core.choices import CachedChoicesFormMixin, CachedModelChoiceField
 from .models import StockItems
 
-class StockItemsForm(forms.ModelForm):
+class StockItemsForm(CachedChoicesFormMixin, forms.ModelForm):
     STATUS_CHOICES = [
         (1, 'Active'),
         (0, 'Inactive'),
     ]
 
-    category = forms.ModelChoiceField(
+    # Choice lists come from the cache until the lookup table changes (core/choices.py)
+    category = CachedModelChoiceField(
         queryset=StockItemCategories.objects.filter(status=1),  # Only active categories
         required=True,
         widget=forms.Select(attrs={'class': 'form-select'}),
         empty_label='Select a category'
     )
 
-    uom = forms.ModelChoiceField(
+    uom = CachedModelChoiceField(
         queryset=StockItemUOM.objects.all(),  # Get all UOMs
         required=True,
         widget=forms.Select(attrs={'class': 'form-select'}),
@@ -0,0 +1,46 @@
+# apps/items/search.py
+"""
+Item lookup for the autocomplete endpoint (items:autocomplete).
+
+Code prefixes are answered first with a range scan of the unique index on
+stock_items.code (SQLite does not use an index for LIKE 'x%'). If that
+leaves room under the limit and the term is long enough, full-text matches
+on the words of code and description fill the rest, best first (FTS5
+index stock_items_fts, see core/fts.py).
+"""
+from django.conf import settings
+
+from core.fts import ITEMS, search
+from .models import StockItems
+
+FIELDS = ('id', 'code', 'description')
+
+
+def prefix_range(term):
+    # code >= term AND code < term + U+10FFFF: every code starting with term
+    return {'code__gte': term, 'code__lt': term + '\U0010ffff'}
+
+
+def autocomplete_items(term, limit):
+    """[{'id', 'code', 'description'}] for at most `limit` items matching `term`."""
+    term = term.strip()
+    if not term or limit < 1:
+        return []
+
+    items = []
+    # Codes are usually typed in upper case; try the term as typed and upper-cased
+    for prefix in dict.fromkeys([term, term.upper()]):
+        found = {item['id'] for item in items}
+        items += (
+            StockItems.objects.filter(**prefix_range(prefix)).exclude(id__in=found)
+            .order_by('code').values(*FIELDS)[:limit - len(items)]
+        )
+        if len(items) >= limit:
+            return items
+
+    if len(term) >= settings.ITEMS_AUTOCOMPLETE_MIN_SUBSTRING:
+        found = {item['id'] for item in items}
+        ranked = [pk for pk in search(ITEMS, term, limit + len(found)) if pk not in found][:limit - len(items)]
+        rows = {item['id']: item for item in StockItems.objects.filter(id__in=ranked).values(*FIELDS)}
+        items += [rows[pk] for pk in ranked if pk in rows]
+    return items
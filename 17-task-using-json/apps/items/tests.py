@@ -0,0 +1,70 @@
+# apps/items/tests.py
+# python manage.py test apps.items.tests
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.doctype.models import StockDocType
+from apps.movements.forms import StockMovementsForm
+from .models import StockItems
+from .search import autocomplete_items
+
+
+class ItemAutocompleteTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        cls.user = User.objects.create_user('user', password='demo')
+        for code, description in [
+            ('BOLT-10', 'Hex bolt M10'),
+            ('BOLT-8', 'Hex bolt M8'),
+            ('NUT-10', 'Nut for bolt M10'),
+            ('WASHER', 'Flat washer'),
+        ]:
+            StockItems.objects.create(code=code, description=description, created_at=now, updated_at=now)
+
+    def codes(self, term, limit=20):
+        return [item['code'] for item in autocomplete_items(term, limit)]
+
+    def test_code_prefix_first_then_words(self):
+        self.assertEqual(self.codes('bolt'), ['BOLT-10', 'BOLT-8', 'NUT-10'])
+        # Word matches: NUT-10 is "... bolt M10"
+        self.assertEqual(self.codes('BOLT-1'), ['BOLT-10', 'NUT-10'])
+        self.assertEqual(self.codes('flat'), ['WASHER'])
+
+    def test_short_terms_match_code_prefix_only(self):
+        self.assertEqual(self.codes('nu'), ['NUT-10'])
+        self.assertEqual(self.codes('ut'), [])
+        self.assertEqual(self.codes('  '), [])
+
+    def test_limit(self):
+        self.assertEqual(self.codes('bolt', limit=2), ['BOLT-10', 'BOLT-8'])
+
+    @override_settings(ITEMS_AUTOCOMPLETE_LIMIT=1)
+    def test_endpoint(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('items:autocomplete'), {'q': 'bolt', 'limit': 50})
+        results = response.json()['results']
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['text'], 'BOLT-10 - Hex bolt M10')
+
+    def test_endpoint_requires_login(self):
+        response = self.client.get(reverse('items:autocomplete'), {'q': 'bolt'})
+        self.assertEqual(response.status_code, 302)
+
+    def test_movement_form_renders_only_the_selected_item(self):
+        now = timezone.now()
+        doctype = StockDocType.objects.create(name='Receipt', created_at=now, updated_at=now)
+        item = StockItems.objects.get(code='NUT-10')
+        html = str(StockMovementsForm(initial={'item': item.id, 'document_type': doctype.id})['item'])
+        self.assertIn(reverse('items:autocomplete'), html)
+        self.assertIn('NUT-10', html)
+        self.assertNotIn('BOLT-10', html)
+
+    def test_movement_form_with_a_bad_item_rerenders(self):
+        self.client.force_login(User.objects.create_superuser('admin', password='demo'))
+        response = self.client.post(reverse('movements:add_record'), {'item': 'abc', 'quantity': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['form'].errors['item'])
@@ -1,99 +1,39 @@
 # apps/items/views.py
-from django.contrib.auth.decorators import login_required
-from django.contrib import messages
 from django.conf import settings
-from django.shortcuts import render, redirect, get_object_or_404
-from django.utils import timezone
-import sqlite3
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+
+from core.crud import StockCreateView, StockDeleteView, StockListView, StockUpdateView
 from .models import StockItems
 from .forms import StockItemsForm
+from .search import autocomplete_items
 
-DB_PATH = settings.BASE_DIR / 'db.sqlite3'
-
-
-@login_required
-def index(request):
-    # Get logged-in user's primary group
-    user_groups = request.user.groups.values_list('name', flat=True)
-    user_group = user_groups[0] if user_groups else None
-
-    # List all stock* tables for display only
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name LIKE 'stock%'")
-    tables = [row[0] for row in cursor.fetchall()]
-    conn.close()
-
-    # Fetch all StockItems
-    records = StockItems.objects.all().order_by('id')
-
-    return render(request, 'items/index.html', {
-        'title': 'Stock Items List',
-        'records': records,
-        'tables': tables,
-        'current_table': 'stock_items',
-        'user_group': user_group,
-    })
+VIEW_OPTIONS = {'model': StockItems, 'label': 'Stock Item', 'noun': 'items'}
 
 
-@login_required
-def add_record(request):
-    # Users group cannot add
-    if not (request.user.is_superuser or request.user.groups.filter(name='Admin').exists()):
-        messages.warning(request, "You do not have permission to add items.")
-        return redirect('items:index')
+class StockItemsListView(StockListView):
+    model = StockItems
+    title = 'Stock Items List'
+    select_related_extra = ('balance',)  # On-hand quantity, joined (category and uom are automatic)
+    query_budget = 4  # session, user, count, page (category, uom and balance joined)
 
-    if request.method == 'POST':
-        form = StockItemsForm(request.POST)
-        if form.is_valid():
-            record = form.save(commit=False)
-            now = timezone.now()
-            record.created_at = now
-            record.updated_at = now
-            record.save()
-            return redirect('items:index')
-    else:
-        form = StockItemsForm()
 
-    return render(request, 'items/form.html', {
-        'title': 'Add Stock Item',
-        'form': form,
-    })
+index = StockItemsListView.as_view()
+add_record = StockCreateView.as_view(form_class=StockItemsForm, **VIEW_OPTIONS)
+update_record = StockUpdateView.as_view(form_class=StockItemsForm, **VIEW_OPTIONS)
+delete_record = StockDeleteView.as_view(**VIEW_OPTIONS)
 
 
 @login_required
-def update_record(request, pk):
-    record = get_object_or_404(StockItems, pk=pk)
-
-    # Users group cannot edit
-    if not (request.user.is_superuser or request.user.groups.filter(name='Admin').exists()):
-        messages.warning(request, "You do not have permission to edit items.")
-        return redirect('items:index')
-
-    if request.method == 'POST':
-        form = StockItemsForm(request.POST, instance=record)
-        if form.is_valid():
-            updated = form.save(commit=False)
-            updated.updated_at = timezone.now()
-            updated.save()
-            return redirect('items:index')
-    else:
-        form = StockItemsForm(instance=record)
-
-    return render(request, 'items/form.html', {
-        'title': f'Update Stock Item ID {record.id}',
-        'form': form,
-    })
-
-
-@login_required
-def delete_record(request, pk):
-    record = get_object_or_404(StockItems, pk=pk)
-
-    # Users group cannot delete
-    if not (request.user.is_superuser or request.user.groups.filter(name='Admin').exists()):
-        messages.warning(request, "You do not have permission to delete items.")
-        return redirect('items:index')
-
-    record.delete()
-    return redirect('items:index')
+def autocomplete(request):
+    # Item picker for the movements form: ?q= code prefix, or substring of code / description
+    try:
+        limit = int(request.GET.get('limit', settings.ITEMS_AUTOCOMPLETE_LIMIT))
+    except ValueError:
+        limit = settings.ITEMS_AUTOCOMPLETE_LIMIT
+    limit = max(1, min(limit, settings.ITEMS_AUTOCOMPLETE_LIMIT))
+
+    items = autocomplete_items(request.GET.get('q', ''), limit)
+    for item in items:
+        item['text'] = f"{item['code']} - {item['description']}" if item['description'] else item['code']
+    return JsonResponse({'results': items})
@@ -1,8 +1,16 @@
 # apps/movements/admin.py (7)
-from django.contrib import admin
+import re
+from collections import defaultdict
+from django.contrib import admin, messages
+from django.db import transaction
+from django.db.models import Q
+from apps.users.roles import ADMIN, has_role
+from core.fts import ITEMS, MOVEMENT_REFERENCES, FullTextSearchAdminMixin
+from .balances import apply_balance_deltas
 from .models import StockMovements
+from .periods import last_closed_period
 
-class StockMovementsAdmin(admin.ModelAdmin):
+class StockMovementsAdmin(FullTextSearchAdminMixin, admin.ModelAdmin):
 
     # System fields always read-only
     readonly_fields = ('id', 'created_at', 'updated_at')
@@ -26,17 +34,47 @@ class StockMovementsAdmin(admin.ModelAdmin):
         'document_type__name',
     ]
 
+    # document_reference and item code / description go through the FTS5 indexes
+    full_text_search = {
+        'id': MOVEMENT_REFERENCES,
+        'item_id': ITEMS,
+    }
+
+    # No 'item' filter: one sidebar link per item does not scale; search by item code instead
     list_filter = [
         'status',
         'document_type',
-        'item',
     ]
 
+    # Item picker searches StockItemsAdmin.search_fields instead of listing every item
+    autocomplete_fields = ['item']
+
     ordering = ['-movement_date']
 
+    def get_search_filter(self, search_term):
+        # Document type name and number: exact matches, never LIKE '%term%'
+        condition = super().get_search_filter(search_term) | Q(document_type__name__iexact=search_term.strip())
+        if re.fullmatch(r'\d+', search_term.strip(), re.ASCII):  # isdigit() also takes superscripts, which int() refuses
+            condition |= Q(document_number=int(search_term))
+        return condition
+
+    def delete_queryset(self, request, queryset):
+        closed = last_closed_period()
+        if closed and queryset.filter(movement_date__lt=closed).exists():
+            self.message_user(request, "Some selected movements belong to a closed period; nothing was deleted.", messages.ERROR)
+            return
+
+        # Bulk "delete selected" bypasses StockMovements.delete(); keep balances in step
+        with transaction.atomic():
+            deltas = defaultdict(int)
+            for item_id, quantity in queryset.values_list('item_id', 'quantity'):
+                deltas[item_id] -= quantity
+            queryset.delete()
+            apply_balance_deltas(deltas)
+
     # Permission rules
     def get_readonly_fields(self, request, obj=None):
-        if request.user.groups.filter(name='Admin').exists():
+        if has_role(request.user, ADMIN):
             return self.readonly_fields
         return (
             'id', 'item', 'document_type', 'document_number', 'document_reference',
@@ -44,16 +82,18 @@ class StockMovementsAdmin(admin.ModelAdmin):
         )
 
     def has_add_permission(self, request):
-        return request.user.groups.filter(name='Admin').exists()
+        return has_role(request.user, ADMIN)
 
     def has_change_permission(self, request, obj=None):
-        return request.user.groups.filter(name='Admin').exists()
+        return has_role(request.user, ADMIN)
 
     def has_delete_permission(self, request, obj=None):
-        return request.user.groups.filter(name='Admin').exists()
+        if obj is not None and obj.is_locked():
+            return False  # Closed period
+        return has_role(request.user, ADMIN)
 
     def has_view_permission(self, request, obj=None):
-        return request.user.groups.filter(name='Admin').exists()
+        return has_role(request.user, ADMIN)
 
 
 admin.site.register(StockMovements, StockMovementsAdmin)
@@ -0,0 +1,200 @@
+# apps/movements/archive.py
+"""
+Per-year archive tables for old stock movements.
+
+`python manage.py archive_movements` moves rows older than a cutoff out of
+the hot `stock_movements` table into `stock_movements_archive_<year>`,
+and records each archive table with its date range in
+`stock_movements_archives`. The daily UI only ever touches the hot table,
+which stays small enough for its indexes to stay in the page cache.
+
+Only closed periods are archived: their balances live on in
+stock_balance_snapshots, so balances as of a date never need an archive
+unless the date itself falls inside the archived range. Read paths call
+archives_for_range() and union an archive table only when the requested
+date range actually reaches into it. The per-item total over the whole
+archive (the stock card's opening balance) is kept, as rows are archived,
+in `stock_movements_archived_totals`: reading it touches no archive table.
+"""
+from django.db import connection, transaction
+from django.db.models import Count, Max, Min
+from django.utils import timezone
+
+from core.versions import bump_table_versions
+from .models import StockArchivedTotals, StockMovementArchives, StockMovements
+from .periods import month_start
+
+ARCHIVE_PREFIX = 'stock_movements_archive_'
+
+COLUMNS = [
+    'id', 'item_id', 'document_type_id', 'document_number', 'document_reference',
+    'quantity', 'status', 'movement_date', 'created_at', 'updated_at',
+]
+
+ARCHIVE_TABLE_SQL = '''
+CREATE TABLE IF NOT EXISTS "{table}" (
+    "id" INTEGER PRIMARY KEY,  -- Same id as in stock_movements
+    "item_id" INTEGER NOT NULL,
+    "document_type_id" INTEGER NOT NULL,
+    "document_number" INTEGER NOT NULL,
+    "document_reference" TEXT,
+    "quantity" INTEGER NOT NULL,
+    "status" INTEGER DEFAULT 1,
+    "movement_date" DATETIME,
+    "created_at" DATETIME,
+    "updated_at" DATETIME
+)
+'''
+
+ARCHIVES_TABLE_SQL = '''
+CREATE TABLE IF NOT EXISTS "stock_movements_archives" (
+    "table_name" VARCHAR(64) PRIMARY KEY,  -- stock_movements_archive_<year>
+    "year" INTEGER NOT NULL,
+    "first_date" DATETIME NOT NULL,  -- Oldest movement_date in the table
+    "last_date" DATETIME NOT NULL,  -- Newest movement_date in the table
+    "rows" INTEGER NOT NULL,
+    "archived_at" DATETIME DEFAULT CURRENT_TIMESTAMP
+)
+'''
+
+ARCHIVED_TOTALS_TABLE_SQL = '''
+CREATE TABLE IF NOT EXISTS "stock_movements_archived_totals" (
+    "item_id" INTEGER PRIMARY KEY,  -- Foreign Key to stock_items table
+    "quantity" INTEGER NOT NULL DEFAULT 0,  -- SUM(quantity) over every archive table
+    FOREIGN KEY("item_id") REFERENCES "stock_items"("id")
+)
+'''
+
+# Add the quantities of the rows being archived to the per-item totals
+ARCHIVED_TOTALS_UPSERT_SQL = '''
+INSERT INTO stock_movements_archived_totals (item_id, quantity)
+SELECT item_id, SUM(quantity) FROM "{table}" WHERE {where} GROUP BY item_id
+ON CONFLICT (item_id) DO UPDATE SET quantity = stock_movements_archived_totals.quantity + excluded.quantity
+'''
+
+ARCHIVE_INDEX_SQL = [
+    'CREATE INDEX IF NOT EXISTS "{table}_item_date_idx" ON "{table}" ("item_id", "movement_date", "id")',
+    'CREATE INDEX IF NOT EXISTS "{table}_movement_date_idx" ON "{table}" ("movement_date")',
+]
+
+
+def archive_table(year):
+    return f'{ARCHIVE_PREFIX}{int(year)}'
+
+
+def ensure_archives_table():
+    missing_totals = StockArchivedTotals._meta.db_table not in connection.introspection.table_names()
+    with connection.cursor() as cursor:
+        cursor.execute(ARCHIVES_TABLE_SQL)
+        cursor.execute(ARCHIVED_TOTALS_TABLE_SQL)
+        if missing_totals:
+            # Archives made before the totals table existed
+            for table in archives_for_range():
+                cursor.execute(ARCHIVED_TOTALS_UPSERT_SQL.format(table=table, where='1 = 1'))
+
+
+def archive_year(year, cutoff):
+    """
+    Move movements of `year` dated before `cutoff` into the year's archive table.
+    One transaction: copy, delete from the hot table, update the registry.
+    Returns the number of rows moved.
+    """
+    table = archive_table(year)
+    adapt = connection.ops.adapt_datetimefield_value
+    start = month_start(year, 1)
+    end = min(month_start(year + 1, 1), cutoff)
+    columns = ', '.join(f'"{column}"' for column in COLUMNS)
+
+    with transaction.atomic():
+        bounds = StockMovements.objects.filter(movement_date__gte=start, movement_date__lt=end).aggregate(
+            first=Min('movement_date'), last=Max('movement_date'), rows=Count('id'),
+        )
+        if not bounds['rows']:
+            return 0
+
+        with connection.cursor() as cursor:
+            cursor.execute(ARCHIVE_TABLE_SQL.format(table=table))
+            for sql in ARCHIVE_INDEX_SQL:
+                cursor.execute(sql.format(table=table))
+            where = 'movement_date >= %s AND movement_date < %s'
+            params = [adapt(start), adapt(end)]
+            cursor.execute(f'INSERT INTO "{table}" ({columns}) SELECT {columns} FROM stock_movements WHERE {where}', params)
+            cursor.execute(ARCHIVED_TOTALS_UPSERT_SQL.format(table='stock_movements', where=where), params)
+            cursor.execute(f'DELETE FROM stock_movements WHERE {where}', params)
+        bump_table_versions(StockMovements, StockArchivedTotals)
+
+        # A year can be archived in several runs; widen the recorded range
+        archive, created = StockMovementArchives.objects.get_or_create(table_name=table, defaults={
+            'year': year,
+            'first_date': bounds['first'],
+            'last_date': bounds['last'],
+            'rows': 0,
+            'archived_at': timezone.now(),
+        })
+        archive.first_date = min(archive.first_date, bounds['first'])
+        archive.last_date = max(archive.last_date, bounds['last'])
+        archive.rows += bounds['rows']
+        archive.archived_at = timezone.now()
+        archive.save()
+    return bounds['rows']
+
+
+def archived_through():
+    """movement_date of the newest archived row, or None if nothing is archived."""
+    return StockMovementArchives.objects.aggregate(last=Max('last_date'))['last']
+
+
+def archive_before(cutoff):
+    """Archive every movement dated before `cutoff`, year by year. Returns [(year, rows)]."""
+    ensure_archives_table()
+    bounds = StockMovements.objects.filter(movement_date__lt=cutoff).aggregate(
+        first=Min('movement_date'), last=Max('movement_date'),
+    )
+    if bounds['first'] is None:
+        return []
+
+    first_year = timezone.localtime(bounds['first']).year
+    last_year = timezone.localtime(bounds['last']).year
+    return [(year, archive_year(year, cutoff)) for year in range(first_year, last_year + 1)]
+
+
+def archives_for_range(start=None, end=None):
+    """Archive tables whose date range overlaps [start, end] (None = open-ended)."""
+    archives = StockMovementArchives.objects.all()
+    if start is not None:
+        archives = archives.filter(last_date__gte=start)
+    if end is not None:
+        archives = archives.filter(first_date__lte=end)
+    return list(archives.order_by('year').values_list('table_name', flat=True))
+
+
+def archived_totals(start=None, end=None, item_ids=None):
+    """{item_id: SUM(quantity)} over the archive tables that [start, end] reaches."""
+    if start is None and end is None:
+        # The whole archive: kept per item by archive_year()
+        totals = StockArchivedTotals.objects.all()
+        if item_ids is not None:
+            totals = totals.filter(item_id__in=item_ids)
+        return dict(totals.values_list('item_id', 'quantity'))
+
+    adapt = connection.ops.adapt_datetimefield_value
+    totals = {}
+    for table in archives_for_range(start, end):
+        where, params = ['1 = 1'], []
+        if start is not None:
+            where.append('movement_date >= %s')
+            params.append(adapt(start))
+        if end is not None:
+            where.append('movement_date <= %s')
+            params.append(adapt(end))
+        if item_ids is not None:
+            where.append(f"item_id IN ({', '.join(['%s'] * len(item_ids))})")
+            params.extend(item_ids)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT item_id, SUM(quantity) FROM "{table}" WHERE {" AND ".join(where)} GROUP BY item_id',
+                params,
+            )
+            for item_id, quantity in cursor.fetchall():
+                totals[item_id] = totals.get(item_id, 0) + quantity
+    return totals
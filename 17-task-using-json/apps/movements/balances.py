@@ -0,0 +1,81 @@
+# apps/movements/balances.py
+"""
+Materialized on-hand stock per item (`stock_item_balances`).
+
+StockMovements.save()/delete() push their quantity change here inside the
+same transaction, so "how many of X do we have" is a primary key lookup
+instead of a SUM over the whole ledger.
+
+Writes that bypass save()/delete() (QuerySet.update/delete, bulk_create,
+raw SQL) must call apply_balance_deltas() themselves, or be followed by
+`python manage.py rebuild_balances`.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from core.versions import bump_table_versions
+
+BALANCES_TABLE_SQL = '''
+CREATE TABLE IF NOT EXISTS "stock_item_balances" (
+    "item_id" INTEGER PRIMARY KEY,  -- Foreign Key to stock_items table
+    "quantity" INTEGER NOT NULL DEFAULT 0,
+    "updated_at" DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY("item_id") REFERENCES "stock_items"("id")
+)
+'''
+
+# Insert the item's row or add to it (SQLite 3.24+ / PostgreSQL upsert)
+UPSERT_SQL = '''
+INSERT INTO stock_item_balances (item_id, quantity, updated_at)
+VALUES (%s, %s, %s)
+ON CONFLICT (item_id) DO UPDATE SET
+    quantity = stock_item_balances.quantity + excluded.quantity,
+    updated_at = excluded.updated_at
+'''
+
+
+def apply_balance_deltas(deltas, using='default'):
+    """
+    Add {item_id: quantity_change} to the balances table.
+    Call inside the transaction that wrote the movements.
+    """
+    conn = transaction.get_connection(using)
+    now = conn.ops.adapt_datetimefield_value(timezone.now())
+    rows = [(item_id, delta, now) for item_id, delta in deltas.items() if delta]
+    if rows:
+        from .models import StockItemBalances
+        with conn.cursor() as cursor:
+            cursor.executemany(UPSERT_SQL, rows)
+        bump_table_versions(StockItemBalances, using=using)  # Raw SQL sends no post_save
+
+
+def rebuild_balances(using='default'):
+    """
+    Recompute every balance from the ledger in one INSERT ... SELECT.
+    Archived movements still count towards the on-hand quantity.
+    Returns the number of items with a balance row.
+    """
+    from .models import StockItemBalances, StockMovementArchives
+
+    conn = transaction.get_connection(using)
+    now = conn.ops.adapt_datetimefield_value(timezone.now())
+    tables = ['stock_movements']
+    if StockMovementArchives._meta.db_table in conn.introspection.table_names():
+        tables += StockMovementArchives.objects.using(using).order_by('year').values_list('table_name', flat=True)
+    ledger = ' UNION ALL '.join(f'SELECT item_id, quantity FROM "{table}"' for table in tables)
+
+    with transaction.atomic(using=using), conn.cursor() as cursor:
+        cursor.execute(BALANCES_TABLE_SQL)
+        cursor.execute('DELETE FROM stock_item_balances')
+        cursor.execute(
+            f'''
+            INSERT INTO stock_item_balances (item_id, quantity, updated_at)
+            SELECT item_id, SUM(quantity), %s
+            FROM ({ledger})
+            GROUP BY item_id
+            ''',
+            [now],
+        )
+        bump_table_versions(StockItemBalances, using=using)
+        cursor.execute('SELECT COUNT(*) FROM stock_item_balances')
+        return cursor.fetchone()[0]
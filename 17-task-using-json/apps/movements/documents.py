@@ -0,0 +1,42 @@
+# apps/movements/documents.py
+"""
+Movements grouped into documents: (document_type, document_number).
+
+One GROUP BY query per page gives line count, total quantity, date range
+and status per document. Grouping follows stock_movements_document_idx
+(document_type_id, document_number), so the database streams the groups
+in index order instead of sorting the whole ledger.
+"""
+from django.db.models import Count, Max, Min, Q, Sum
+
+from .models import StockMovements
+
+
+def document_summaries(document_type=None, document_number=None):
+    queryset = StockMovements.objects.all()
+    if document_type:
+        queryset = queryset.filter(document_type_id=document_type)
+    if document_number:
+        queryset = queryset.filter(document_number=document_number)
+
+    return (
+        queryset
+        .values('document_type_id', 'document_type__name', 'document_number')
+        .annotate(
+            lines=Count('id'),
+            total_quantity=Sum('quantity'),
+            first_date=Min('movement_date'),
+            last_date=Max('movement_date'),
+            active_lines=Count('id', filter=Q(status=1)),
+        )
+        .order_by('document_type_id', '-document_number')
+    )
+
+
+def document_status(summary):
+    """Active (all lines active), Inactive (none) or Partial."""
+    if summary['active_lines'] == summary['lines']:
+        return 'Active'
+    if summary['active_lines'] == 0:
+        return 'Inactive'
+    return 'Partial'
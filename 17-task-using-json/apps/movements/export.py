@@ -0,0 +1,103 @@
+# apps/movements/export.py
+"""
+Streaming export of the whole stock_movements ledger, archived years included.
+
+Rows come from values_list() (tuples, no model instances) read with
+iterator(chunk_size=...), archive tables from a cursor with fetchmany(),
+and each line is yielded as soon as it is formatted, so memory stays flat
+whatever the number of rows.
+"""
+import csv
+import json
+from datetime import datetime
+from itertools import chain
+
+from django.conf import settings
+from django.db import connections, router
+
+from .archive import archives_for_range
+from .models import StockMovements
+
+# (header, values_list lookup)
+EXPORT_COLUMNS = [
+    ('id', 'id'),
+    ('movement_date', 'movement_date'),
+    ('document_type_id', 'document_type_id'),
+    ('document_type', 'document_type__name'),
+    ('document_number', 'document_number'),
+    ('document_reference', 'document_reference'),
+    ('item_id', 'item_id'),
+    ('item_code', 'item__code'),
+    ('quantity', 'quantity'),
+    ('status', 'status'),
+    ('created_at', 'created_at'),
+    ('updated_at', 'updated_at'),
+]
+
+HEADERS = [header for header, _ in EXPORT_COLUMNS]
+
+# Same columns, same order, from an archive table
+ARCHIVE_EXPORT_SQL = '''
+SELECT a.id, a.movement_date, a.document_type_id, d.name, a.document_number, a.document_reference,
+       a.item_id, i.code, a.quantity, a.status, a.created_at, a.updated_at
+FROM "{table}" a
+JOIN stock_document_type d ON d.id = a.document_type_id
+JOIN stock_items i ON i.id = a.item_id
+ORDER BY a.id
+'''
+
+DATETIME_COLUMNS = [HEADERS.index(name) for name in ('movement_date', 'created_at', 'updated_at')]
+
+
+def archived_rows():
+    connection = connections[router.db_for_read(StockMovements)]
+    convert = connection.ops.convert_datetimefield_value  # What the ORM does for a DateTimeField
+    for table in archives_for_range():
+        with connection.cursor() as cursor:
+            cursor.execute(ARCHIVE_EXPORT_SQL.format(table=table))
+            while rows := cursor.fetchmany(settings.MOVEMENTS_EXPORT_CHUNK_SIZE):
+                for row in rows:
+                    row = list(row)
+                    for index in DATETIME_COLUMNS:
+                        row[index] = convert(row[index], None, connection)
+                    yield tuple(row)
+
+
+def export_rows():
+    """Ledger rows as tuples: archived years first, then the hot table, each by id."""
+    return chain(archived_rows(), (
+        StockMovements.objects
+        .order_by('id')
+        .values_list(*[lookup for _, lookup in EXPORT_COLUMNS])
+        .iterator(chunk_size=settings.MOVEMENTS_EXPORT_CHUNK_SIZE)
+    ))
+
+
+def plain(row):
+    # Same datetime format in both outputs (full precision ISO 8601)
+    return [value.isoformat() if isinstance(value, datetime) else value for value in row]
+
+
+class Echo:
+    """File-like object whose write() just returns the line (csv.writer needs one)."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines():
+    writer = csv.writer(Echo())
+    yield writer.writerow(HEADERS)
+    for row in export_rows():
+        yield writer.writerow(plain(row))
+
+
+def jsonl_lines():
+    for row in export_rows():
+        yield json.dumps(dict(zip(HEADERS, plain(row)))) + '\n'
+
+
+FORMATS = {
+    'csv': ('text/csv', csv_lines),
+    'jsonl': ('application/x-ndjson', jsonl_lines),
+}
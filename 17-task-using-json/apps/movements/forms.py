@@ -1,9 +1,12 @@
 # apps/movements/forms.py (5)
 from django import forms
 from django.utils import timezone
+
+from core.choices import CachedChoicesFormMixin, CachedModelChoiceField
+from core.widgets import AutocompleteSelect
 from .models import StockMovements
 
-class StockMovementsForm(forms.ModelForm):
+class StockMovementsForm(CachedChoicesFormMixin, forms.ModelForm):
 
     movement_date = forms.DateTimeField(
         initial=timezone.now,
@@ -27,8 +30,14 @@ class StockMovementsForm(forms.ModelForm):
             'movement_date',
         ]
 
+        # Choice lists come from the cache until the lookup table changes (core/choices.py)
+        field_classes = {
+            'document_type': CachedModelChoiceField,
+        }
+
         widgets = {
-            'item': forms.Select(attrs={'class': 'form-select'}),
+            # Too many items for one <select>: searched as the user types (items:autocomplete)
+            'item': AutocompleteSelect('items:autocomplete', attrs={'class': 'form-select'}),
             'document_type': forms.Select(attrs={'class': 'form-select'}),
             'document_number': forms.NumberInput(attrs={'class': 'form-control'}),
             'document_reference': forms.Textarea(attrs={'class': 'form-control', 'rows': 3}),
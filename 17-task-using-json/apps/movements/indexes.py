@@ -0,0 +1,103 @@
+# apps/movements/indexes.py
+"""
+Declared indexes for the unmanaged stock tables, and the hot queries
+that must use them.
+
+The stock models are `managed = False`, so migrations never create
+indexes for them. `python manage.py stock_indexes` creates what is
+declared here and verifies it with EXPLAIN QUERY PLAN.
+"""
+import re
+from datetime import datetime
+
+from django.db.models import F, Sum, Window
+from django.utils import timezone
+
+# (index name, table, columns)
+STOCK_INDEXES = [
+    # Stock card and per-item balances: filter by item, ordered by date
+    ('stock_movements_item_date_idx', 'stock_movements', ('item_id', 'movement_date', 'id')),
+    # Document lookups; also serves document_type_id alone (leftmost column)
+    ('stock_movements_document_idx', 'stock_movements', ('document_type_id', 'document_number')),
+    # Period close, balances as of a date, date range reports
+    ('stock_movements_movement_date_idx', 'stock_movements', ('movement_date',)),
+    ('stock_items_category_idx', 'stock_items', ('category_id',)),
+    ('stock_items_uom_idx', 'stock_items', ('uom_id',)),
+    ('stock_balance_snapshots_period_end_idx', 'stock_balance_snapshots', ('period_end',)),
+]
+
+STOCK_TABLES = {
+    'stock_movements',
+    'stock_items',
+    'stock_items_uom',
+    'stock_items_categories',
+    'stock_document_type',
+    'stock_item_balances',
+    'stock_balance_snapshots',
+}
+
+# "SCAN stock_movements" is a full table scan; "SCAN t USING INDEX" walks an index in order
+FULL_SCAN = re.compile(r'\bSCAN (\w+)(?: AS \w+)?\s*$')
+
+
+def create_index_sql(name, table, columns, quote):
+    cols = ', '.join(quote(column) for column in columns)
+    return f'CREATE INDEX IF NOT EXISTS {quote(name)} ON {quote(table)} ({cols})'
+
+
+def hot_queries():
+    """
+    {name: queryset} for the queries the UI and reports run all day.
+    Parameters are placeholders; only the plan shape matters.
+    """
+    from apps.items.models import StockItems
+    from apps.items.search import prefix_range
+    from .documents import document_summaries
+    from .models import StockBalanceSnapshots, StockItemBalances, StockMovements
+
+    moment = timezone.make_aware(datetime(2025, 1, 1))
+    return {
+        'movements list (keyset page)': (
+            StockMovements.objects.select_related('item', 'document_type')
+            .filter(id__lt=1).order_by('-id')[:50]
+        ),
+        'stock card (running balance)': (
+            StockMovements.objects.filter(item_id=1)
+            .annotate(balance=Window(
+                expression=Sum('quantity'),
+                partition_by=[F('item_id')],
+                order_by=[F('movement_date').asc(), F('id').asc()],
+            ))
+            .order_by('movement_date', 'id')[:50]
+        ),
+        'movements of a document': StockMovements.objects.filter(document_type_id=1, document_number=1),
+        'movements by document type': StockMovements.objects.filter(document_type_id=1).values('id')[:50],
+        'documents listing': document_summaries()[:50],
+        'movements in a period': (
+            StockMovements.objects.filter(movement_date__gte=moment, movement_date__lt=moment)
+            .values('item_id').annotate(total=Sum('quantity'))
+        ),
+        'item movements since snapshot': (
+            StockMovements.objects.filter(item_id__in=[1], movement_date__gte=moment, movement_date__lte=moment)
+            .values('item_id').annotate(total=Sum('quantity'))
+        ),
+        'latest closed period': (
+            StockBalanceSnapshots.objects.filter(period_end__lte=moment)
+            .order_by('-period_end').values('period_end')[:1]
+        ),
+        'on-hand balance': StockItemBalances.objects.filter(item_id=1),
+        'items by category': StockItems.objects.filter(category_id=1),
+        'items by uom': StockItems.objects.filter(uom_id=1),
+        'item by code': StockItems.objects.filter(code='X'),
+        'item autocomplete (code prefix)': StockItems.objects.filter(**prefix_range('X')).order_by('code')[:20],
+    }
+
+
+def full_scans(plan):
+    """Stock tables the plan reads with a full table scan."""
+    scans = []
+    for line in plan.splitlines():
+        match = FULL_SCAN.search(line)
+        if match and match.group(1) in STOCK_TABLES:
+            scans.append(match.group(1))
+    return scans
@@ -0,0 +1,43 @@
+# apps/movements/management/commands/archive_movements.py
+# python manage.py archive_movements                   -> archive what is older than MOVEMENTS_ARCHIVE_KEEP_MONTHS
+# python manage.py archive_movements --before 2025-01  -> archive movements dated before January 2025
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.movements.archive import archive_before
+from apps.movements.periods import last_closed_period, month_start, parse_month, previous_month
+
+
+class Command(BaseCommand):
+    help = 'Move old stock_movements rows into per-year stock_movements_archive_<year> tables.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--before', help='Archive movements dated before this month, YYYY-MM.')
+
+    def handle(self, *args, **options):
+        if options['before']:
+            try:
+                cutoff = parse_month(options['before'])
+            except ValueError:
+                raise CommandError('Months must be given as YYYY-MM.')
+        else:
+            now = timezone.localtime()
+            cutoff = month_start(now.year, now.month)
+            for _ in range(settings.MOVEMENTS_ARCHIVE_KEEP_MONTHS):
+                cutoff = previous_month(cutoff)
+
+        # Archived rows are never read back for edits or snapshots: only closed periods may go
+        closed = last_closed_period()
+        if closed is None:
+            raise CommandError('No closed period: run close_period first.')
+        if cutoff > closed:
+            self.stdout.write(self.style.WARNING(f'Periods are closed up to {closed:%Y-%m-%d}; archiving before that.'))
+            cutoff = closed
+
+        archived = [(year, rows) for year, rows in archive_before(cutoff) if rows]
+        for year, rows in archived:
+            self.stdout.write(f'Archived {year}: {rows} movement(s).')
+        self.stdout.write(self.style.SUCCESS(
+            f'{sum(rows for _, rows in archived)} movement(s) dated before {cutoff:%Y-%m-%d} archived.'
+        ))
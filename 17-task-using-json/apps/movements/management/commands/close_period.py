@@ -0,0 +1,44 @@
+# apps/movements/management/commands/close_period.py
+# python manage.py close_period                     -> close every finished month
+# python manage.py close_period --through 2025-10   -> close up to October 2025
+# python manage.py close_period --reopen 2025-10    -> drop October 2025 onwards
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.movements.archive import archived_through
+from apps.movements.periods import close_periods, month_start, parse_month, previous_month, reopen_periods
+
+
+class Command(BaseCommand):
+    help = 'Write monthly stock_balance_snapshots so balances as of a date only scan the open period.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--through', help='Last month to close, YYYY-MM (default: last finished month).')
+        parser.add_argument('--reopen', help='Drop snapshots for this month (YYYY-MM) and every later one.')
+
+    def handle(self, *args, **options):
+        now = timezone.localtime()
+        this_month = month_start(now.year, now.month)
+
+        try:
+            if options['reopen']:
+                period_start = parse_month(options['reopen'])
+                archived = archived_through()
+                if archived and period_start <= archived:
+                    # Re-closing would rebuild snapshots from the hot table only
+                    raise CommandError(f'Movements up to {archived:%Y-%m-%d} are archived; they cannot be reopened.')
+                deleted = reopen_periods(period_start)
+                self.stdout.write(self.style.WARNING(f"Reopened from {options['reopen']}: {deleted} snapshot(s) removed."))
+                return
+
+            through = parse_month(options['through']) if options['through'] else previous_month(this_month)
+        except ValueError:
+            raise CommandError('Months must be given as YYYY-MM.')
+
+        if through >= this_month:
+            raise CommandError('Only finished months can be closed.')
+
+        closed = close_periods(through)
+        for period_start, rows in closed:
+            self.stdout.write(f'Closed {period_start:%Y-%m}: {rows} item snapshot(s).')
+        self.stdout.write(self.style.SUCCESS(f'{len(closed)} period(s) closed.'))
@@ -0,0 +1,13 @@
+# apps/movements/management/commands/rebuild_balances.py
+# python manage.py rebuild_balances
+from django.core.management.base import BaseCommand
+
+from apps.movements.balances import rebuild_balances
+
+
+class Command(BaseCommand):
+    help = 'Create stock_item_balances if needed and rebuild it from stock_movements.'
+
+    def handle(self, *args, **options):
+        count = rebuild_balances()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt balances for {count} item(s).'))
@@ -0,0 +1,52 @@
+# apps/movements/management/commands/stock_indexes.py
+# python manage.py stock_indexes           -> create missing indexes, then verify
+# python manage.py stock_indexes --check   -> verify only (exit code 1 on failure, for deploy gates)
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from apps.movements.indexes import STOCK_INDEXES, create_index_sql, full_scans, hot_queries
+
+
+class Command(BaseCommand):
+    help = 'Create the declared indexes on the unmanaged stock tables and verify hot query plans.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='Do not create anything, only verify.')
+
+    def handle(self, *args, **options):
+        problems = []
+
+        with connection.cursor() as cursor:
+            tables = set(connection.introspection.table_names(cursor))
+
+            for name, table, columns in STOCK_INDEXES:
+                if table not in tables:
+                    problems.append(f'{table}: table does not exist')
+                    continue
+
+                if not options['check']:
+                    cursor.execute(create_index_sql(name, table, columns, connection.ops.quote_name))
+
+                # Match on columns, not on name: an equivalent index created by hand also counts
+                constraints = connection.introspection.get_constraints(cursor, table)
+                if any(c['index'] and tuple(c['columns']) == columns for c in constraints.values()):
+                    self.stdout.write(f'  ok    {name} ON {table} ({", ".join(columns)})')
+                else:
+                    problems.append(f'{name}: missing index on {table} ({", ".join(columns)})')
+
+        if connection.vendor == 'sqlite':
+            for label, queryset in hot_queries().items():
+                scans = full_scans(queryset.explain())
+                if scans:
+                    problems.append(f'{label}: full table scan of {", ".join(scans)}')
+                else:
+                    self.stdout.write(f'  ok    plan: {label}')
+        else:
+            self.stdout.write(self.style.WARNING(f'Query plans are only checked on SQLite (not {connection.vendor}).'))
+
+        if problems:
+            for problem in problems:
+                self.stderr.write(f'  FAIL  {problem}')
+            raise CommandError(f'{len(problems)} stock index check(s) failed.')
+
+        self.stdout.write(self.style.SUCCESS('Stock indexes and query plans OK.'))
@@ -1,8 +1,11 @@
 # apps/movements/models.py (4)
-from django.db import models
+from collections import defaultdict
+from django.core.exceptions import ValidationError
+from django.db import models, router, transaction
 from django.utils import timezone
 from apps.items.models import StockItems
 from apps.doctype.models import StockDocType
+from .balances import apply_balance_deltas
 
 class StockMovements(models.Model):
     STATUS_CHOICES = [
@@ -41,14 +44,141 @@ class StockMovements(models.Model):
     def __str__(self):
         return f"Movement #{self.id} - {self.item.code}"
 
+    def clean(self):
+        # Movements inside a closed period would silently break its snapshots
+        from .periods import last_closed_period
+        closed = last_closed_period()
+        if closed is None:
+            return
+        if self.movement_date and self.movement_date < closed:
+            raise ValidationError({'movement_date': f"Period closed up to {closed:%Y-%m-%d}."})
+        if self.id and self.is_locked(closed):
+            raise ValidationError(f"Movement #{self.id} belongs to a closed period.")
+
+    def is_locked(self, closed=None):
+        """True if the stored row is dated inside a closed period."""
+        from .periods import last_closed_period
+        closed = closed or last_closed_period()
+        if closed is None or not self.id:
+            return False
+        return type(self).objects.filter(pk=self.pk, movement_date__lt=closed).exists()
+
     def save(self, *args, **kwargs):
         """
         Automatically set updated_at to now on save.
         Keep created_at unchanged for existing records.
+        Keep stock_item_balances in step, in the same transaction.
         """
         if not self.id:
             # New record → set created_at
             self.created_at = timezone.now()
         # Always update updated_at
         self.updated_at = timezone.now()
-        super().save(*args, **kwargs)
+
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            deltas = defaultdict(int)
+            if self.id:
+                # Undo what the stored row counted before (item or quantity may change)
+                previous = type(self).objects.using(using).filter(pk=self.pk).values_list('item_id', 'quantity').first()
+                if previous:
+                    deltas[previous[0]] -= previous[1]
+            super().save(*args, **kwargs)
+            deltas[self.item_id] += self.quantity
+            apply_balance_deltas(deltas, using=using)
+
+    def delete(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            result = super().delete(*args, **kwargs)
+            apply_balance_deltas({self.item_id: -self.quantity}, using=using)
+        return result
+
+
+class StockItemBalances(models.Model):
+    """
+    Current on-hand quantity per item, maintained by StockMovements.
+    Rebuild with: python manage.py rebuild_balances
+    """
+    item = models.OneToOneField(
+        StockItems,
+        on_delete=models.CASCADE,  # An item left without movements can be deleted; its (zero) balance goes with it
+        primary_key=True,
+        db_column='item_id',
+        related_name='balance',
+    )
+    quantity = models.IntegerField(default=0)
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'stock_item_balances'
+        managed = False  # Created by `rebuild_balances`
+
+    def __str__(self):
+        return f"{self.item_id}: {self.quantity}"
+
+
+class StockBalanceSnapshots(models.Model):
+    """
+    Closing balance per item per closed month.
+    Written by: python manage.py close_period
+    """
+    id = models.AutoField(primary_key=True)
+    item = models.ForeignKey(
+        StockItems,
+        on_delete=models.DO_NOTHING,
+        db_column='item_id'
+    )
+    period_end = models.DateTimeField()  # First instant after the closed month
+    quantity = models.IntegerField()
+    created_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'stock_balance_snapshots'
+        managed = False  # Created by `close_period`
+        unique_together = [('item', 'period_end')]
+
+    def __str__(self):
+        return f"{self.item_id} @ {self.period_end:%Y-%m-%d}: {self.quantity}"
+
+
+class StockMovementArchives(models.Model):
+    """
+    One row per stock_movements_archive_<year> table.
+    Written by: python manage.py archive_movements
+    """
+    table_name = models.CharField(max_length=64, primary_key=True)
+    year = models.IntegerField()
+    first_date = models.DateTimeField()  # Oldest movement_date in the table
+    last_date = models.DateTimeField()  # Newest movement_date in the table
+    rows = models.IntegerField()
+    archived_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'stock_movements_archives'
+        managed = False  # Created by `archive_movements`
+
+    def __str__(self):
+        return f"{self.table_name}: {self.rows} rows"
+
+
+class StockArchivedTotals(models.Model):
+    """
+    SUM(quantity) per item over every archive table: the opening balance of
+    the stock card. Maintained by archive_year(), in the same transaction.
+    """
+    item = models.OneToOneField(
+        StockItems,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        db_column='item_id',
+        related_name='archived_total',
+    )
+    quantity = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'stock_movements_archived_totals'
+        managed = False  # Created by `archive_movements`
+
+    def __str__(self):
+        return f"{self.item_id}: {self.quantity}"
@@ -0,0 +1,85 @@
+# apps/movements/pagination.py
+"""
+Keyset (seek) pagination on the primary key.
+
+OFFSET pagination makes the database walk and throw away every row before
+the requested page. Keyset pagination remembers the last id shown and asks
+for `id < cursor` instead, so the primary key index jumps straight to the
+page: page 5,000 costs the same as page 1, and only `size` rows are loaded.
+
+Pages are ordered newest first (`-id`):
+  ?after=<id>   -> older rows (next page)
+  ?before=<id>  -> newer rows (previous page)
+"""
+from django.conf import settings
+
+
+class KeysetPage:
+
+    def __init__(self, records, size, has_next, has_previous):
+        self.records = records
+        self.size = size
+        self.has_next = has_next
+        self.has_previous = has_previous
+
+    @staticmethod
+    def _key(row):
+        # Works for model instances and for .values() dicts
+        return row['id'] if isinstance(row, dict) else row.pk
+
+    @property
+    def next_cursor(self):
+        return self._key(self.records[-1]) if self.has_next and self.records else None
+
+    @property
+    def previous_cursor(self):
+        return self._key(self.records[0]) if self.has_previous and self.records else None
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __len__(self):
+        return len(self.records)
+
+
+def keyset_page(queryset, after=None, before=None, size=None):
+    """
+    Return one KeysetPage of `queryset`, newest first.
+    Fetches size + 1 rows to know if another page exists, never more.
+    """
+    size = size or settings.MOVEMENTS_PAGE_SIZE
+
+    if before is not None:
+        # Walk forward from the cursor, then flip back to newest first
+        rows = list(queryset.filter(id__gt=before).order_by('id')[:size + 1])
+        has_previous = len(rows) > size
+        rows = rows[:size][::-1]
+        return KeysetPage(rows, size, has_next=True, has_previous=has_previous)
+
+    queryset = queryset.order_by('-id')
+    if after is not None:
+        queryset = queryset.filter(id__lt=after)
+
+    rows = list(queryset[:size + 1])
+    has_next = len(rows) > size
+    return KeysetPage(rows[:size], size, has_next=has_next, has_previous=after is not None)
+
+
+def page_params(request):
+    """
+    Read ?after= / ?before= / ?size= from the query string.
+    Invalid values are ignored; size is capped by MOVEMENTS_MAX_PAGE_SIZE.
+    """
+    def as_int(name):
+        try:
+            value = int(request.GET.get(name, ''))
+        except ValueError:
+            return None
+        return value if value > 0 else None
+
+    size = as_int('size') or settings.MOVEMENTS_PAGE_SIZE
+    return {
+        'after': as_int('after'),
+        'before': as_int('before'),
+        'size': min(size, settings.MOVEMENTS_MAX_PAGE_SIZE),
+    }
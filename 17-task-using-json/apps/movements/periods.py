@@ -0,0 +1,173 @@
+# apps/movements/periods.py
+"""
+Monthly period close for stock_movements.
+
+Closing a month writes one `stock_balance_snapshots` row per item: its
+balance from all movements before `period_end` (the first instant of the
+next month). A balance as of date D is then
+
+    snapshot at the latest period_end <= D  +  movements from period_end to D
+
+so a report never scans more than the one open period, instead of years
+of movement_date history. Closed periods are locked: movements dated
+before the last period_end can no longer be added, edited or deleted.
+"""
+from datetime import datetime
+
+from django.db import connection, transaction
+from django.db.models import Max, Min, Sum
+from django.utils import timezone
+
+from .models import StockBalanceSnapshots, StockMovements
+
+SNAPSHOTS_TABLE_SQL = '''
+CREATE TABLE IF NOT EXISTS "stock_balance_snapshots" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT,
+    "item_id" INTEGER NOT NULL,  -- Foreign Key to stock_items table
+    "period_end" DATETIME NOT NULL,  -- First instant after the closed month
+    "quantity" INTEGER NOT NULL,  -- Closing balance: all movements before period_end
+    "created_at" DATETIME DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE("item_id", "period_end"),
+    FOREIGN KEY("item_id") REFERENCES "stock_items"("id")
+)
+'''
+
+SNAPSHOTS_INDEX_SQL = '''
+CREATE INDEX IF NOT EXISTS "stock_balance_snapshots_period_end_idx" ON "stock_balance_snapshots" ("period_end")
+'''
+
+
+def month_start(year, month):
+    return timezone.make_aware(datetime(year, month, 1))
+
+
+def next_month(moment):
+    if moment.month == 12:
+        return month_start(moment.year + 1, 1)
+    return month_start(moment.year, moment.month + 1)
+
+
+def previous_month(moment):
+    if moment.month == 1:
+        return month_start(moment.year - 1, 12)
+    return month_start(moment.year, moment.month - 1)
+
+
+def parse_month(value):
+    """'2025-10' -> aware datetime of 2025-10-01 00:00."""
+    year, month = value.split('-')
+    return month_start(int(year), int(month))
+
+
+def last_closed_period():
+    """period_end of the latest closed month, or None if nothing is closed."""
+    return StockBalanceSnapshots.objects.aggregate(last=Max('period_end'))['last']
+
+
+def ensure_snapshots_table():
+    with connection.cursor() as cursor:
+        cursor.execute(SNAPSHOTS_TABLE_SQL)
+        cursor.execute(SNAPSHOTS_INDEX_SQL)
+
+
+def close_period(period_start):
+    """
+    Close the month starting at `period_start`.
+    Carries the previous snapshot forward and adds only this month's movements.
+    """
+    period_end = next_month(period_start)
+    previous = last_closed_period()
+    adapt = connection.ops.adapt_datetimefield_value
+    now = adapt(timezone.now())
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        if previous is None:
+            cursor.execute(
+                '''
+                INSERT INTO stock_balance_snapshots (item_id, period_end, quantity, created_at)
+                SELECT item_id, %s, SUM(quantity), %s
+                FROM stock_movements
+                WHERE movement_date < %s
+                GROUP BY item_id
+                ''',
+                [adapt(period_end), now, adapt(period_end)],
+            )
+        else:
+            cursor.execute(
+                '''
+                INSERT INTO stock_balance_snapshots (item_id, period_end, quantity, created_at)
+                SELECT item_id, %s, SUM(quantity), %s
+                FROM (
+                    SELECT item_id, quantity FROM stock_balance_snapshots WHERE period_end = %s
+                    UNION ALL
+                    SELECT item_id, quantity FROM stock_movements
+                    WHERE movement_date >= %s AND movement_date < %s
+                )
+                GROUP BY item_id
+                ''',
+                [adapt(period_end), now, adapt(previous), adapt(previous), adapt(period_end)],
+            )
+        return cursor.rowcount
+
+
+def close_periods(through):
+    """
+    Close every month after the last closed one, up to and including
+    the month starting at `through`. Returns [(period_start, rows), ...].
+    """
+    ensure_snapshots_table()
+    start = last_closed_period()
+    if start is None:
+        first = StockMovements.objects.aggregate(first=Min('movement_date'))['first']
+        if first is None:
+            return []
+        first = timezone.localtime(first)
+        start = month_start(first.year, first.month)
+
+    closed = []
+    while start <= through:
+        closed.append((start, close_period(start)))
+        start = next_month(start)
+    return closed
+
+
+def reopen_periods(period_start):
+    """Drop snapshots for the month starting at `period_start` and every later month."""
+    deleted, _ = StockBalanceSnapshots.objects.filter(period_end__gt=period_start).delete()
+    return deleted
+
+
+def balances_as_of(when, item_ids=None):
+    """
+    {item_id: balance} including every movement up to and including `when`.
+    Pass item_ids to limit the work to one page of items.
+    """
+    snapshots = StockBalanceSnapshots.objects.all()
+    movements = StockMovements.objects.filter(movement_date__lte=when)
+    if item_ids is not None:
+        snapshots = snapshots.filter(item_id__in=item_ids)
+        movements = movements.filter(item_id__in=item_ids)
+
+    period_end = (
+        StockBalanceSnapshots.objects
+        .filter(period_end__lte=when)
+        .aggregate(last=Max('period_end'))['last']
+    )
+
+    balances = {}
+    if period_end is not None:
+        balances.update(snapshots.filter(period_end=period_end).values_list('item_id', 'quantity'))
+        movements = movements.filter(movement_date__gte=period_end)
+
+    for item_id, delta in movements.values('item_id').annotate(delta=Sum('quantity')).values_list('item_id', 'delta'):
+        balances[item_id] = balances.get(item_id, 0) + delta
+
+    # Archived rows only matter when `when` falls inside the archived range
+    from .archive import archived_totals
+    for item_id, delta in archived_totals(period_end, when, item_ids).items():
+        balances[item_id] = balances.get(item_id, 0) + delta
+    return balances
+
+
+def balance_as_of(item_id, when):
+    return balances_as_of(when, item_ids=[item_id]).get(item_id, 0)
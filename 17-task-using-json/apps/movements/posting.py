@@ -0,0 +1,159 @@
+# apps/movements/posting.py
+"""
+Post a whole stock document (header + lines) in one request.
+
+All item ids are checked with a single IN query, the document type with
+another, and the lines are written with bulk_create inside one
+transaction, together with their stock_item_balances deltas.
+"""
+import re
+from collections import defaultdict
+from datetime import datetime, time
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from apps.doctype.models import StockDocType
+from apps.items.models import StockItems
+from core.versions import bump_table_versions
+from .balances import apply_balance_deltas
+from .models import StockMovements
+from .periods import last_closed_period
+
+
+class DocumentError(Exception):
+    """Carries the per-line errors: [{'line': n, 'error': msg}, ...] (line 0 = header)."""
+
+    def __init__(self, errors):
+        super().__init__(f'{len(errors)} error(s) in document')
+        self.errors = errors
+
+
+def insert_movements(movements, batch_size=500):
+    """
+    bulk_create unsaved StockMovements and update balances, atomically.
+    bulk_create skips save(), so timestamps and balance deltas are done here.
+    """
+    now = timezone.now()
+    deltas = defaultdict(int)
+    for movement in movements:
+        movement.created_at = now
+        movement.updated_at = now
+        deltas[movement.item_id] += movement.quantity
+
+    with transaction.atomic():
+        StockMovements.objects.bulk_create(movements, batch_size=batch_size)
+        apply_balance_deltas(deltas)
+        bump_table_versions(StockMovements)  # bulk_create sends no post_save
+    return len(movements)
+
+
+def parse_moment(value):
+    """ISO datetime or date -> aware datetime, or None (also for impossible ones, e.g. 2025-02-30)."""
+    if isinstance(value, str):
+        try:
+            moment = parse_datetime(value)
+            if moment is None and parse_date(value):
+                moment = datetime.combine(parse_date(value), time.min)
+        except ValueError:
+            return None  # Well-formed but out of range
+        if moment is not None:
+            return moment if timezone.is_aware(moment) else timezone.make_aware(moment)
+    return None
+
+
+# What an INTEGER column holds in SQLite; a bigger number overflows in the driver
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+def as_int(value):
+    """An int (or a string of ASCII digits) within the 64-bit range, else None."""
+    # JSON true/false are ints in Python; refuse them
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, str) and re.fullmatch(r'-?\d+', value.strip(), re.ASCII):  # isdigit() also takes superscripts
+        value = int(value)
+    if isinstance(value, int) and INT64_MIN <= value <= INT64_MAX:
+        return value
+    return None
+
+
+def post_document(data):
+    """
+    Validate and insert a document. Returns the number of lines created.
+    Raises DocumentError listing every problem found.
+    """
+    errors = []
+
+    def error(line, message):
+        errors.append({'line': line, 'error': message})
+
+    if not isinstance(data, dict):
+        raise DocumentError([{'line': 0, 'error': 'Expected a JSON object.'}])
+
+    document_type_id = as_int(data.get('document_type'))
+    document_number = as_int(data.get('document_number'))
+    movement_date = parse_moment(data.get('movement_date')) if data.get('movement_date') else timezone.now()
+    status = as_int(data.get('status', 1))
+    lines = data.get('lines')
+
+    if document_type_id is None:
+        error(0, 'document_type must be an id.')
+    if document_number is None:
+        error(0, 'document_number must be a 64-bit integer.')
+    if movement_date is None:
+        error(0, 'movement_date must be an ISO date or datetime.')
+    if status not in dict(StockMovements.STATUS_CHOICES):
+        error(0, 'status must be 1 or 0.')
+    if not isinstance(data.get('document_reference'), (str, type(None))):
+        error(0, 'document_reference must be a string or null.')
+    if not isinstance(lines, list) or not lines:
+        error(0, 'lines must be a non-empty list.')
+    elif len(lines) > settings.MOVEMENTS_MAX_POST_LINES:
+        error(0, f'At most {settings.MOVEMENTS_MAX_POST_LINES} lines per document.')
+    if errors:
+        raise DocumentError(errors)
+
+    closed = last_closed_period()
+    if closed and movement_date < closed:
+        raise DocumentError([{'line': 0, 'error': f'Period closed up to {closed:%Y-%m-%d}.'}])
+
+    # One IN query per lookup table, whatever the number of lines
+    if not StockDocType.objects.filter(id__in=[document_type_id]).exists():
+        error(0, f'Unknown document_type {document_type_id}.')
+
+    item_ids = {as_int(line.get('item')) for line in lines if isinstance(line, dict)}
+    item_ids.discard(None)
+    known_items = set(StockItems.objects.filter(id__in=item_ids).values_list('id', flat=True))
+
+    movements = []
+    for number, line in enumerate(lines, start=1):
+        if not isinstance(line, dict):
+            error(number, 'Expected an object with item and quantity.')
+            continue
+        item_id = as_int(line.get('item'))
+        quantity = as_int(line.get('quantity'))
+        if item_id not in known_items:
+            error(number, f"Unknown item {line.get('item')!r}.")
+        if quantity is None:
+            error(number, 'quantity must be a 64-bit integer.')
+        if not isinstance(line.get('document_reference'), (str, type(None))):
+            error(number, 'document_reference must be a string or null.')
+        if errors:
+            continue
+        movements.append(StockMovements(
+            item_id=item_id,
+            document_type_id=document_type_id,
+            document_number=document_number,
+            document_reference=line.get('document_reference', data.get('document_reference')),
+            quantity=quantity,
+            status=status,
+            movement_date=movement_date,
+        ))
+
+    if errors:
+        raise DocumentError(errors)
+
+    return insert_movements(movements)
@@ -0,0 +1,415 @@
+# apps/movements/tests.py
+# python manage.py test apps.movements.tests
+import json
+from datetime import datetime
+from io import StringIO
+from unittest import mock
+from django.contrib.auth.models import Group, User
+from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.doctype.models import StockDocType
+from apps.items.models import StockItems
+from .archive import archives_for_range, ensure_archives_table
+from .models import (
+    StockArchivedTotals, StockBalanceSnapshots, StockItemBalances, StockMovementArchives, StockMovements,
+)
+from .export import export_rows
+from .indexes import full_scans
+from .pagination import keyset_page
+from .periods import balance_as_of, close_periods, parse_month
+
+
+class StockMovementsTestData(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        cls.user = User.objects.create_user('user', password='demo')
+        cls.item = StockItems.objects.create(code='ITEM-1', created_at=now, updated_at=now)
+        cls.doctype = StockDocType.objects.create(name='Receipt', created_at=now, updated_at=now)
+        cls.movements = [
+            StockMovements.objects.create(
+                item=cls.item,
+                document_type=cls.doctype,
+                document_number=1000 + n,
+                quantity=n,
+                movement_date=now,
+            )
+            for n in range(1, 8)
+        ]
+
+
+class KeysetPaginationTestCase(StockMovementsTestData):
+
+    def test_pages_walk_newest_first(self):
+        ids = [m.id for m in reversed(self.movements)]
+
+        first = keyset_page(StockMovements.objects.all(), size=3)
+        self.assertEqual([m.id for m in first], ids[:3])
+        self.assertFalse(first.has_previous)
+        self.assertEqual(first.next_cursor, ids[2])
+
+        second = keyset_page(StockMovements.objects.all(), after=first.next_cursor, size=3)
+        self.assertEqual([m.id for m in second], ids[3:6])
+
+        last = keyset_page(StockMovements.objects.all(), after=second.next_cursor, size=3)
+        self.assertEqual([m.id for m in last], ids[6:])
+        self.assertIsNone(last.next_cursor)
+
+        back = keyset_page(StockMovements.objects.all(), before=second.previous_cursor, size=3)
+        self.assertEqual([m.id for m in back], ids[:3])
+        self.assertIsNone(back.previous_cursor)
+
+    def test_page_cost_is_bounded(self):
+        # One query per page, whatever the cursor position
+        with self.assertNumQueries(1):
+            page = keyset_page(
+                StockMovements.objects.select_related('item', 'document_type'),
+                after=self.movements[-3].id,
+                size=2,
+            )
+            [m.item.code for m in page]
+
+    @override_settings(MOVEMENTS_MAX_PAGE_SIZE=4)
+    def test_feed_follows_next_links(self):
+        self.client.force_login(self.user)
+
+        response = self.client.get(reverse('movements:feed'), {'size': 100})
+        data = response.json()
+        self.assertEqual(len(data['results']), 4)
+        self.assertEqual(data['results'][0]['item__code'], 'ITEM-1')
+        self.assertIsNone(data['previous'])
+
+        data = self.client.get(data['next']).json()
+        self.assertEqual(len(data['results']), 3)
+        self.assertIsNone(data['next'])
+
+    def test_index_renders_one_page(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('movements:index'), {'size': 2})
+        self.assertEqual(len(response.context['records']), 2)
+        self.assertContains(response, 'Older')
+
+
+class StockItemBalancesTestCase(StockMovementsTestData):
+
+    def balance(self, item):
+        return StockItemBalances.objects.get(item=item).quantity
+
+    def test_save_and_delete_keep_balance(self):
+        self.assertEqual(self.balance(self.item), 28)  # 1 + 2 + ... + 7
+
+        movement = self.movements[0]
+        movement.quantity = 10
+        movement.save()
+        self.assertEqual(self.balance(self.item), 37)
+
+        movement.delete()
+        self.assertEqual(self.balance(self.item), 27)
+
+    def test_moving_a_line_to_another_item(self):
+        now = timezone.now()
+        other = StockItems.objects.create(code='ITEM-2', created_at=now, updated_at=now)
+
+        movement = self.movements[-1]
+        movement.item = other
+        movement.save()
+        self.assertEqual(self.balance(self.item), 21)
+        self.assertEqual(self.balance(other), 7)
+
+    def test_item_without_movements_can_be_deleted(self):
+        for movement in self.movements:
+            movement.delete()
+        self.assertEqual(self.balance(self.item), 0)
+
+        self.item.delete()
+        connection.check_constraints()  # The balance row would fail the item foreign key
+        self.assertFalse(StockItemBalances.objects.exists())
+
+    def test_rebuild_matches_ledger(self):
+        StockItemBalances.objects.all().delete()
+        call_command('rebuild_balances', stdout=StringIO())
+        self.assertEqual(self.balance(self.item), 28)
+
+
+class StockCardTestCase(StockMovementsTestData):
+
+    @override_settings(MOVEMENTS_PAGE_SIZE=3)
+    def test_running_balance_carries_across_pages(self):
+        self.client.force_login(self.user)
+        url = reverse('movements:stock_card', args=[self.item.id])
+
+        first = self.client.get(url).context['page']
+        self.assertEqual([row.balance for row in first], [1, 3, 6])
+
+        last = self.client.get(url, {'page': 3}).context['page']
+        self.assertEqual([row.balance for row in last], [28])
+
+
+class PeriodCloseTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        cls.item = StockItems.objects.create(code='ITEM-1', created_at=now, updated_at=now)
+        cls.doctype = StockDocType.objects.create(name='Receipt', created_at=now, updated_at=now)
+        for day, quantity in [('2025-01-10', 5), ('2025-02-03', 3), ('2025-02-20', -2), ('2025-03-15', 4)]:
+            StockMovements.objects.create(
+                item=cls.item,
+                document_type=cls.doctype,
+                document_number=1,
+                quantity=quantity,
+                movement_date=timezone.make_aware(datetime.fromisoformat(day)),
+            )
+
+    def as_of(self, day):
+        return balance_as_of(self.item.id, timezone.make_aware(datetime.fromisoformat(day)))
+
+    def test_snapshots_match_full_scan(self):
+        close_periods(parse_month('2025-02'))
+        self.assertEqual(
+            list(StockBalanceSnapshots.objects.order_by('period_end').values_list('quantity', flat=True)),
+            [5, 6],
+        )
+        self.assertEqual(self.as_of('2025-01-31'), 5)
+        self.assertEqual(self.as_of('2025-02-10'), 8)
+        self.assertEqual(self.as_of('2025-12-31'), 10)
+
+    def test_report_falls_back_to_today_for_an_impossible_date(self):
+        self.client.force_login(User.objects.create_user('user', password='demo'))
+        response = self.client.get(reverse('movements:balances'), {'as_of': '2025-02-30'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['as_of'], timezone.localdate())
+
+    def test_closed_period_is_locked(self):
+        close_periods(parse_month('2025-02'))
+        movement = StockMovements(
+            item=self.item,
+            document_type=self.doctype,
+            document_number=2,
+            quantity=1,
+            movement_date=timezone.make_aware(datetime(2025, 2, 27)),
+        )
+        with self.assertRaises(ValidationError):
+            movement.full_clean()
+        self.assertTrue(StockMovements.objects.order_by('movement_date').first().is_locked())
+
+
+class StockIndexesTestCase(TestCase):
+
+    def test_declared_indexes_cover_hot_queries(self):
+        # Raises CommandError if an index is missing or a plan falls back to a full scan
+        call_command('stock_indexes', stdout=StringIO())
+        call_command('stock_indexes', '--check', stdout=StringIO())
+
+    def test_full_scan_detection(self):
+        self.assertEqual(full_scans('2 0 0 SCAN stock_movements'), ['stock_movements'])
+        self.assertEqual(full_scans('3 0 0 SCAN stock_movements USING INDEX stock_movements_item_date_idx'), [])
+        self.assertEqual(full_scans('6 0 0 SEARCH stock_items USING INTEGER PRIMARY KEY (rowid=?)'), [])
+        self.assertEqual(full_scans('67 0 0 SCAN (subquery-2)'), [])
+
+
+class PostDocumentTestCase(StockMovementsTestData):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.admin = User.objects.create_user('admin', password='root')
+        cls.admin.groups.add(Group.objects.create(name='Admin'))
+
+    def post(self, lines, **header):
+        document = {'document_type': self.doctype.id, 'document_number': 9000, 'lines': lines, **header}
+        return self.client.post(reverse('movements:post_document'), json.dumps(document), content_type='application/json')
+
+    def test_posts_all_lines_with_constant_queries(self):
+        self.client.force_login(self.admin)
+
+        with CaptureQueriesContext(connection) as small:
+            self.assertEqual(self.post([{'item': self.item.id, 'quantity': 1}] * 2).status_code, 201)
+        with CaptureQueriesContext(connection) as large:
+            response = self.post([{'item': self.item.id, 'quantity': 1}] * 300)
+
+        self.assertEqual(response.json(), {'created': 300})
+        # Lookups don't grow with the line count; only the batched INSERTs do
+        self.assertLess(len(large) - len(small), 5)
+        self.assertEqual(StockMovements.objects.filter(document_number=9000).count(), 302)
+        self.assertEqual(StockItemBalances.objects.get(item=self.item).quantity, 28 + 302)
+
+    def test_rejects_whole_document_on_bad_line(self):
+        self.client.force_login(self.admin)
+        response = self.post([{'item': self.item.id, 'quantity': 1}, {'item': 999, 'quantity': 'x'}])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([e['line'] for e in response.json()['errors']], [2, 2])
+        self.assertFalse(StockMovements.objects.filter(document_number=9000).exists())
+
+        response = self.post([{'item': self.item.id, 'quantity': '\u00b2'}])
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(StockMovements.objects.filter(document_number=9000).exists())
+
+    def test_out_of_range_numbers_and_non_string_references_are_refused(self):
+        self.client.force_login(self.admin)
+        response = self.post([{'item': self.item.id, 'quantity': 1}], document_number=str(2 ** 63))
+        self.assertEqual(response.json()['errors'], [{'line': 0, 'error': 'document_number must be a 64-bit integer.'}])
+
+        response = self.post([
+            {'item': self.item.id, 'quantity': 10 ** 20},
+            {'item': self.item.id, 'quantity': 1, 'document_reference': {'a': 1}},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            [(e['line'], e['error']) for e in response.json()['errors']],
+            [(1, 'quantity must be a 64-bit integer.'), (2, 'document_reference must be a string or null.')],
+        )
+        self.assertFalse(StockMovements.objects.filter(document_number=9000).exists())
+
+    def test_impossible_date_is_a_validation_error(self):
+        self.client.force_login(self.admin)
+        response = self.post([{'item': self.item.id, 'quantity': 1}], movement_date='2025-02-30')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('movement_date must be an ISO date or datetime.', [e['error'] for e in response.json()['errors']])
+        self.assertFalse(StockMovements.objects.filter(document_number=9000).exists())
+
+    def test_users_group_cannot_post(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.post([{'item': self.item.id, 'quantity': 1}]).status_code, 403)
+
+
+class ExportTestCase(StockMovementsTestData):
+
+    def export(self, fmt):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('movements:export'), {'format': fmt})
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv(self):
+        lines = self.export('csv').splitlines()
+        self.assertEqual(lines[0].split(',')[:4], ['id', 'movement_date', 'document_type_id', 'document_type'])
+        self.assertEqual(len(lines), 1 + len(self.movements))
+        self.assertIn('ITEM-1', lines[1])
+
+    def test_jsonl(self):
+        rows = [json.loads(line) for line in self.export('jsonl').splitlines()]
+        self.assertEqual([row['id'] for row in rows], [m.id for m in self.movements])
+        self.assertEqual(rows[0]['document_type'], 'Receipt')
+
+
+class DocumentsTestCase(StockMovementsTestData):
+
+    def test_one_row_per_document(self):
+        self.movements[1].document_number = self.movements[0].document_number
+        self.movements[1].status = 0
+        self.movements[1].save()
+
+        self.client.force_login(self.user)
+        self.client.get(reverse('movements:documents'))  # Caches the user's roles in the session
+        with self.assertNumQueries(5):  # session, user, count, page, doc type filter
+            page = self.client.get(reverse('movements:documents')).context['page']
+
+        merged = next(doc for doc in page if doc['document_number'] == 1001)
+        self.assertEqual(len(page), 6)
+        self.assertEqual((merged['lines'], merged['total_quantity'], merged['status']), (2, 3, 'Partial'))
+
+    def test_filters_ignore_non_ascii_digits(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('movements:documents'), {'type': '\u00b2', 'number': '\u00b2'})
+        self.assertEqual(len(response.context['page']), 7)
+
+    def test_detail_lists_document_lines(self):
+        self.client.force_login(self.user)
+        url = reverse('movements:document_detail', args=[self.doctype.id, 1003])
+        self.assertEqual([m.quantity for m in self.client.get(url).context['page']], [3])
+
+
+class ArchiveTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        cls.user = User.objects.create_user('user', password='demo')
+        cls.item = StockItems.objects.create(code='ITEM-1', created_at=now, updated_at=now)
+        cls.doctype = StockDocType.objects.create(name='Receipt', created_at=now, updated_at=now)
+        for day, quantity in [('2023-06-10', 5), ('2024-03-03', 3), ('2024-11-20', -2), ('2025-02-15', 4)]:
+            StockMovements.objects.create(
+                item=cls.item,
+                document_type=cls.doctype,
+                document_number=1,
+                quantity=quantity,
+                movement_date=cls.day(day),
+            )
+
+    @staticmethod
+    def day(value):
+        return timezone.make_aware(datetime.fromisoformat(value))
+
+    def archive(self):
+        close_periods(parse_month('2024-12'))
+        call_command('archive_movements', '--before', '2025-01', stdout=StringIO())
+
+    def test_moves_old_rows_into_year_tables(self):
+        self.archive()
+        self.assertEqual(StockMovements.objects.count(), 1)
+        self.assertEqual(
+            list(StockMovementArchives.objects.order_by('year').values_list('table_name', 'rows')),
+            [('stock_movements_archive_2023', 1), ('stock_movements_archive_2024', 2)],
+        )
+
+    def test_reads_union_only_the_archives_they_reach(self):
+        self.archive()
+        self.assertEqual(archives_for_range(self.day('2025-01-01'), self.day('2025-12-31')), [])
+        self.assertEqual(archives_for_range(self.day('2024-06-01'), self.day('2025-12-31')), ['stock_movements_archive_2024'])
+
+    def test_balances_still_count_archived_rows(self):
+        self.archive()
+        self.assertEqual(balance_as_of(self.item.id, self.day('2024-06-01')), 8)
+        self.assertEqual(balance_as_of(self.item.id, self.day('2025-12-31')), 10)
+
+        StockItemBalances.objects.all().delete()
+        call_command('rebuild_balances', stdout=StringIO())
+        self.assertEqual(StockItemBalances.objects.get(item=self.item).quantity, 10)
+
+        self.client.force_login(self.user)
+        self.assertEqual(StockArchivedTotals.objects.get(item=self.item).quantity, 6)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('movements:stock_card', args=[self.item.id]))
+        self.assertFalse(any('stock_movements_archive_' in query['sql'] for query in queries.captured_queries))
+        self.assertEqual(response.context['opening'], 6)
+        self.assertEqual([row.balance for row in response.context['page']], [10])
+
+        lines = b''.join(self.client.get(reverse('movements:export')).streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 1 + 4)
+
+    @override_settings(MOVEMENTS_EXPORT_CHUNK_SIZE=1)
+    def test_export_streams_archived_rows_as_tuples(self):
+        self.archive()
+        with mock.patch.object(StockMovements.objects, 'raw', side_effect=AssertionError('loads a whole table')):
+            rows = list(export_rows())
+        self.assertEqual([row[8] for row in rows], [5, 3, -2, 4])
+        self.assertEqual(rows[0][1], self.day('2023-06-10'))  # Converted like the ORM converts the hot rows
+        self.assertEqual(rows[0][3], 'Receipt')
+
+    def test_totals_of_earlier_archives_are_filled_in(self):
+        self.archive()
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TABLE stock_movements_archived_totals')
+        ensure_archives_table()
+        self.assertEqual(StockArchivedTotals.objects.get(item=self.item).quantity, 6)
+
+    def test_only_closed_periods_are_archived(self):
+        with self.assertRaises(CommandError):
+            call_command('archive_movements', '--before', '2025-01', stdout=StringIO())
+
+        close_periods(parse_month('2024-06'))
+        call_command('archive_movements', '--before', '2025-01', stdout=StringIO())
+        self.assertEqual(StockMovements.objects.count(), 2)  # Clamped to the end of June 2024
+
+        with self.assertRaises(CommandError):
+            call_command('close_period', '--reopen', '2024-03', stdout=StringIO())
@@ -6,6 +6,13 @@ app_name = 'movements'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('feed/', views.feed, name='feed'),  # JSON list, keyset paginated
+    path('item/<int:item_id>/', views.stock_card, name='stock_card'),  # Per-item ledger with running balance
+    path('balances/', views.balances_report, name='balances'),  # Balances as of a date (period snapshots)
+    path('post/', views.post_document_view, name='post_document'),  # Whole document (header + lines) as JSON
+    path('export/', views.export, name='export'),  # Streaming CSV / JSON Lines of the whole ledger
+    path('documents/', views.documents, name='documents'),  # Movements grouped by document
+    path('documents/<int:document_type>/<int:document_number>/', views.document_detail, name='document_detail'),
     path('add/', views.add_record, name='add_record'),  # This must match the URL used in the template
     path('update/<int:pk>/', views.update_record, name='update_record'),
     path('delete/<int:pk>/', views.delete_record, name='delete_record'),
@@ -1,100 +1,221 @@
 # apps/movements/views.py (6)
 from django.contrib.auth.decorators import login_required
-from django.contrib import messages
 from django.conf import settings
-from django.shortcuts import render, redirect, get_object_or_404
+from django.core.paginator import Paginator
+from django.db.models import F, Sum, Value, Window
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_POST
+from django.shortcuts import render, get_object_or_404
+from django.urls import reverse
 from django.utils import timezone
-import sqlite3
-
+from django.utils.dateparse import parse_date
+from django.utils.http import urlencode
+from datetime import datetime, time
+import json
+import re
+
+from apps.doctype.models import StockDocType
+from apps.items.models import StockItems
+from apps.users.roles import is_admin
+from core.crud import StockCreateView, StockDeleteView, StockListView, StockUpdateView
+from .archive import archived_totals
 from .models import StockMovements
 from .forms import StockMovementsForm
+from .documents import document_status, document_summaries
+from .export import FORMATS
+from .pagination import keyset_page, page_params
+from .periods import balances_as_of, last_closed_period
+from .posting import DocumentError, post_document
+
+
+class StockMovementsListView(StockListView):
+    model = StockMovements
+    title = 'Stock Movements List'
+    query_budget = 3  # session, user, page (item and document_type joined)
+
+    def paginate_queryset(self, queryset, page_size):
+        # Keyset pages (newest first) instead of OFFSET: page cost does not grow with depth
+        page = keyset_page(queryset, **page_params(self.request))
+        return None, page, page.records, page.has_next or page.has_previous
+
+
+index = StockMovementsListView.as_view()
+
+
+@login_required
+def feed(request):
+    # JSON version of the list, same keyset cursors (?after= / ?before= / ?size=)
+    params = page_params(request)
+    page = keyset_page(
+        StockMovements.objects.values(
+            'id',
+            'movement_date',
+            'document_type__name',
+            'document_number',
+            'item__code',
+            'item__description',
+            'quantity',
+            'document_reference',
+            'status',
+            'updated_at',
+        ),
+        **params,
+    )
+
+    def page_url(**cursor):
+        return f"{reverse('movements:feed')}?{urlencode({'size': params['size'], **cursor})}"
+
+    return JsonResponse({
+        'results': page.records,
+        'next': page_url(after=page.next_cursor) if page.next_cursor else None,
+        'previous': page_url(before=page.previous_cursor) if page.previous_cursor else None,
+    })
+
+
+@login_required
+def export(request):
+    # Whole ledger as ?format=csv (default) or ?format=jsonl, streamed row by row
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in FORMATS:
+        raise Http404(f"Unknown export format '{fmt}'.")
+
+    content_type, lines = FORMATS[fmt]
+    response = StreamingHttpResponse(lines(), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="stock_movements.{fmt}"'
+    return response
+
 
-DB_PATH = settings.BASE_DIR / 'db.sqlite3'
+@login_required
+def documents(request):
+    # One row per (document_type, document_number), aggregated by the database
+    document_type = request.GET.get('type', '')
+    document_number = request.GET.get('number', '')
+    summaries = document_summaries(  # ASCII digits only: isdigit() also takes superscripts, which int() refuses
+        document_type=int(document_type) if re.fullmatch(r'\d+', document_type, re.ASCII) else None,
+        document_number=int(document_number) if re.fullmatch(r'\d+', document_number, re.ASCII) else None,
+    )
+
+    page = Paginator(summaries, settings.MOVEMENTS_PAGE_SIZE).get_page(request.GET.get('page'))
+    for summary in page:
+        summary['status'] = document_status(summary)
+
+    return render(request, 'movements/documents.html', {
+        'title': 'Stock Documents',
+        'page': page,
+        'doctypes': StockDocType.objects.order_by('name'),
+        'document_type': document_type,
+        'document_number': document_number,
+    })
 
 
 @login_required
-def index(request):
-    # Get logged-in user's primary group
-    user_groups = request.user.groups.values_list('name', flat=True)
-    user_group = user_groups[0] if user_groups else None
-
-    # List all stock* tables (display only)
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name LIKE 'stock%'")
-    tables = [row[0] for row in cursor.fetchall()]
-    conn.close()
-
-    # Fetch all StockMovements
-    records = StockMovements.objects.all().order_by('-id')
-
-    return render(request, 'movements/index.html', {
-        'title': 'Stock Movements List',
-        'records': records,
-        'tables': tables,
-        'current_table': 'stock_movements',
-        'user_group': user_group,
+def document_detail(request, document_type, document_number):
+    doctype = get_object_or_404(StockDocType, pk=document_type)
+    records = (
+        StockMovements.objects
+        .filter(document_type=doctype, document_number=document_number)
+        .select_related('item')
+        .order_by('id')
+    )
+    page = Paginator(records, settings.MOVEMENTS_PAGE_SIZE).get_page(request.GET.get('page'))
+
+    return render(request, 'movements/document_detail.html', {
+        'title': f'{doctype.name} {document_number}',
+        'page': page,
     })
 
 
 @login_required
-def add_record(request):
-    # Users group cannot add
-    if not (request.user.is_superuser or request.user.groups.filter(name='Admin').exists()):
-        messages.warning(request, "You do not have permission to add stock movements.")
-        return redirect('movements:index')
-
-    if request.method == 'POST':
-        form = StockMovementsForm(request.POST)
-        if form.is_valid():
-            record = form.save(commit=False)
-            now = timezone.now()
-            record.created_at = now
-            record.updated_at = now
-            record.save()
-            return redirect('movements:index')
-    else:
-        form = StockMovementsForm()
-
-    return render(request, 'movements/form.html', {
-        'title': 'Add Stock Movement',
-        'form': form,
+def stock_card(request, item_id):
+    item = get_object_or_404(StockItems.objects.select_related('balance'), pk=item_id)
+
+    # Archived movements are older than anything in the hot table: they only add an opening balance
+    opening = archived_totals(item_ids=[item.id]).get(item.id, 0)
+
+    # Running balance per movement, computed by the database in one query:
+    # SUM(quantity) OVER (PARTITION BY item_id ORDER BY movement_date, id)
+    records = (
+        StockMovements.objects
+        .filter(item=item)
+        .select_related('document_type')
+        .annotate(balance=Window(
+            expression=Sum('quantity'),
+            partition_by=[F('item_id')],
+            order_by=[F('movement_date').asc(), F('id').asc()],
+        ) + Value(opening))
+        .order_by('movement_date', 'id')
+    )
+
+    # LIMIT/OFFSET apply after the window, so page N still carries the full running total
+    page = Paginator(records, settings.MOVEMENTS_PAGE_SIZE).get_page(request.GET.get('page'))
+
+    return render(request, 'movements/stock_card.html', {
+        'title': f'Stock Card - {item.code}',
+        'item': item,
+        'opening': opening,
+        'page': page,
     })
 
 
 @login_required
-def update_record(request, pk):
-    record = get_object_or_404(StockMovements, pk=pk)
-
-    # Users group cannot edit
-    if not (request.user.is_superuser or request.user.groups.filter(name='Admin').exists()):
-        messages.warning(request, "You do not have permission to edit stock movements.")
-        return redirect('movements:index')
-
-    if request.method == 'POST':
-        form = StockMovementsForm(request.POST, instance=record)
-        if form.is_valid():
-            updated = form.save(commit=False)
-            updated.updated_at = timezone.now()
-            updated.save()
-            return redirect('movements:index')
-    else:
-        form = StockMovementsForm(instance=record)
-
-    return render(request, 'movements/form.html', {
-        'title': f'Update Movement ID {record.id}',
-        'form': form,
+def balances_report(request):
+    # Balance of every item as of the end of ?as_of=YYYY-MM-DD (default: today)
+    try:
+        as_of = parse_date(request.GET.get('as_of', '')) or timezone.localdate()
+    except ValueError:
+        as_of = timezone.localdate()  # Well-formed but impossible, e.g. 2025-02-30
+    when = timezone.make_aware(datetime.combine(as_of, time.max))
+
+    page = Paginator(StockItems.objects.order_by('code'), settings.MOVEMENTS_PAGE_SIZE).get_page(request.GET.get('page'))
+
+    # Latest snapshot + movements since it, for this page's items only
+    balances = balances_as_of(when, item_ids=[item.id for item in page])
+    for item in page:
+        item.balance_as_of = balances.get(item.id, 0)
+
+    return render(request, 'movements/balances.html', {
+        'title': 'Stock Balances',
+        'page': page,
+        'as_of': as_of,
+        'closed_through': last_closed_period(),
     })
 
 
 @login_required
-def delete_record(request, pk):
-    record = get_object_or_404(StockMovements, pk=pk)
+@require_POST
+def post_document_view(request):
+    """
+    Post a whole document as JSON:
+    {"document_type": 1, "document_number": 52343, "movement_date": "2025-11-22T18:00:00",
+     "document_reference": "GR-1", "lines": [{"item": 1, "quantity": 10}, ...]}
+    """
+    if not is_admin(request.user):
+        return JsonResponse({'errors': [{'line': 0, 'error': 'You do not have permission to add stock movements.'}]}, status=403)
+
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({'errors': [{'line': 0, 'error': 'Invalid JSON.'}]}, status=400)
+
+    try:
+        created = post_document(data)
+    except DocumentError as e:
+        return JsonResponse({'errors': e.errors}, status=400)
+
+    return JsonResponse({'created': created}, status=201)
+
+
+class StockMovementsDeleteView(StockDeleteView):
+
+    def delete_refused(self, record):
+        # Closed periods are locked (their balance snapshots depend on them)
+        if record.is_locked():
+            return "This movement belongs to a closed period and cannot be deleted."
+
 
-    # Users group cannot delete
-    if not (request.user.is_superuser or request.user.groups.filter(name='Admin').exists()):
-        messages.warning(request, "You do not have permission to delete stock movements.")
-        return redirect('movements:index')
+VIEW_OPTIONS = {'model': StockMovements, 'label': 'Stock Movement', 'noun': 'stock movements'}
 
-    record.delete()
-    return redirect('movements:index')
+# StockMovements.save() sets created_at / updated_at and keeps balances in step
+add_record = StockCreateView.as_view(form_class=StockMovementsForm, **VIEW_OPTIONS)
+update_record = StockUpdateView.as_view(form_class=StockMovementsForm, **VIEW_OPTIONS)
+delete_record = StockMovementsDeleteView.as_view(**VIEW_OPTIONS)
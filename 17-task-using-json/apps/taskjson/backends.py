@@ -0,0 +1,235 @@
+# apps/taskjson/backends.py
+"""
+Storage backends for the task JSON app, selected by settings.TASKJSON_BACKEND
+(dotted path of a TaskBackend subclass). The views only call storage().
+
+- JsonDocumentBackend: media/tasks.json as one JSON document,
+  {"next_id": n, "tasks": [...]}, rewritten whole (atomically) on every
+  change. Reads are cheap while the file is unchanged; writes cost O(n).
+- JournalBackend (default): the same document as a snapshot plus an
+  append-only JSON Lines journal (apps/taskjson/store.py). Writes are one
+  small append; the journal is folded into the snapshot in the background.
+- SqliteBackend: media/tasks.sqlite3, one row per task, the task kept as a
+  JSON document and edited in place with the JSON1 functions.
+
+The document and journal backends share tasks.json. The document backend
+folds a journal it finds into tasks.json before using the file, so a
+switch between the two loses or replays nothing.
+`python manage.py taskjson_benchmark` compares the backends.
+"""
+import json
+import os
+import sqlite3
+import threading
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from . import store
+
+
+def storage():
+    """The configured backend."""
+    return import_string(settings.TASKJSON_BACKEND)()
+
+
+class TaskBackend:
+    """Tasks are dicts with an int 'id'; ids come from the backend and are never reused."""
+
+    def list_tasks(self):
+        """Every task, oldest first. The dicts are the caller's to change."""
+        raise NotImplementedError
+
+    def get_task(self, task_id):
+        """The task with this id, or None."""
+        raise NotImplementedError
+
+    def create_task(self, fields):
+        """Store `fields` as a new task with the next id. Returns the task."""
+        raise NotImplementedError
+
+    def update_task(self, task_id, **fields):
+        raise NotImplementedError
+
+    def delete_task(self, task_id):
+        raise NotImplementedError
+
+    def load_tasks(self, tasks, next_id):
+        """Replace every task at once (benchmark and migration between backends)."""
+        raise NotImplementedError
+
+
+class JournalBackend(TaskBackend):
+
+    def list_tasks(self):
+        return store.read_tasks()
+
+    def get_task(self, task_id):
+        return store.get_task(task_id)
+
+    def create_task(self, fields):
+        return store.add_task(fields)
+
+    def update_task(self, task_id, **fields):
+        store.update_task(task_id, **fields)
+
+    def delete_task(self, task_id):
+        store.delete_task(task_id)
+
+    def load_tasks(self, tasks, next_id):
+        tmp = store.dump_snapshot({'next_id': next_id, 'tasks': tasks})
+        # A running compaction would write its stale snapshot over this one: wait for it
+        with store.compaction_guard(), store.locked():
+            os.replace(tmp, store.snapshot_path())
+            for path in [store.compacting_path(), store.journal_path()]:
+                if os.path.exists(path):
+                    os.remove(path)
+        store.fsync_directory(store.snapshot_path())
+
+
+# JsonDocumentBackend: {snapshot path: (signature, TaskIndex)}
+_documents = {}
+
+
+class JsonDocumentBackend(TaskBackend):
+
+    def __init__(self):
+        self.fold_journal()
+
+    def fold_journal(self):
+        # Events left by the journal backend belong in tasks.json before it is read as the whole store
+        while os.path.exists(store.journal_path()) or os.path.exists(store.compacting_path()):
+            store.compact(wait=True)
+
+    def index(self):
+        # Call with the store lock held; re-parsed only when the file's signature changes
+        path = store.snapshot_path()
+        sig = store.signature(path)
+        cached = _documents.get(path)
+        if cached is None or cached[0] != sig:
+            cached = (sig, store.TaskIndex(*store.load_snapshot()))
+            _documents[path] = cached
+        return cached[1]
+
+    def write(self, index):
+        path = store.snapshot_path()
+        tmp = store.dump_snapshot({'next_id': index.next_id, 'tasks': index.tasks()})
+        os.replace(tmp, path)
+        store.fsync_directory(path)
+        _documents[path] = (store.signature(path), index)
+
+    def change(self, apply):
+        """Read-modify-write under the exclusive store lock."""
+        with store.locked():
+            current = self.index()
+            index = store.TaskIndex(current.tasks(), current.next_id)  # The cached one stays intact if the write fails
+            result = apply(index)
+            self.write(index)
+        return result
+
+    def list_tasks(self):
+        with store.locked(shared=True):
+            return [dict(task) for task in self.index().tasks()]
+
+    def get_task(self, task_id):
+        with store.locked(shared=True):
+            task = self.index().by_id.get(task_id)
+            return dict(task) if task else None
+
+    def create_task(self, fields):
+        def create(index):
+            task = {**fields, 'id': index.next_id}
+            index.apply([{'op': 'create', 'task': task}])
+            return task
+        return self.change(create)
+
+    def update_task(self, task_id, **fields):
+        self.change(lambda index: index.apply([{'op': 'update', 'id': task_id, 'fields': fields}]))
+
+    def delete_task(self, task_id):
+        self.change(lambda index: index.apply([{'op': 'delete', 'id': task_id}]))
+
+    def load_tasks(self, tasks, next_id):
+        with store.locked():
+            self.write(store.TaskIndex(tasks, next_id))
+
+
+SQLITE_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,  -- AUTOINCREMENT: the id of a deleted task is never given out again
+    data TEXT NOT NULL CHECK (json_valid(data))  -- The task without its id, as a JSON object
+)
+'''
+
+# SqliteBackend: one connection per thread and database file
+_connections = threading.local()
+
+
+class SqliteBackend(TaskBackend):
+
+    def path(self):
+        return os.path.join(settings.MEDIA_ROOT, 'tasks.sqlite3')
+
+    def connection(self):
+        path = self.path()
+        connections = _connections.__dict__.setdefault('by_path', {})
+        if path not in connections:
+            conn = sqlite3.connect(path, timeout=5, isolation_level=None)  # Autocommit: one statement per change
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('PRAGMA synchronous = NORMAL')
+            conn.execute(SQLITE_SCHEMA)
+            connections[path] = conn
+        return connections[path]
+
+    def row_task(self, task_id, data):
+        return {'id': task_id, **json.loads(data)}
+
+    def list_tasks(self):
+        rows = self.connection().execute('SELECT id, data FROM tasks ORDER BY id')
+        return [self.row_task(*row) for row in rows]
+
+    def get_task(self, task_id):
+        row = self.connection().execute('SELECT id, data FROM tasks WHERE id = ?', (task_id,)).fetchone()
+        return self.row_task(*row) if row else None
+
+    def create_task(self, fields):
+        data = {key: value for key, value in fields.items() if key != 'id'}
+        cursor = self.connection().execute('INSERT INTO tasks (data) VALUES (json(?))', (json.dumps(data),))
+        return {**data, 'id': cursor.lastrowid}
+
+    def update_task(self, task_id, **fields):
+        # json_set() writes the changed keys into the stored document, inside SQLite. Not json_patch():
+        # it deletes a key set to null, where the other backends store None
+        fields.pop('id', None)
+        if not fields:
+            return
+        conn = self.connection()
+        if any('"' in key for key in fields):
+            # A JSON path cannot quote a key holding '"': merge in Python, in one write transaction
+            with conn:
+                conn.execute('BEGIN IMMEDIATE')
+                row = conn.execute('SELECT data FROM tasks WHERE id = ?', (task_id,)).fetchone()
+                if row:
+                    data = {**json.loads(row[0]), **fields}
+                    conn.execute('UPDATE tasks SET data = ? WHERE id = ?', (json.dumps(data), task_id))
+            return
+        params = []
+        for key, value in fields.items():
+            params += [f'$."{key}"', json.dumps(value)]  # Quoted: any other key is a valid path
+        pairs = ', '.join(['?, json(?)'] * len(fields))
+        conn.execute(f'UPDATE tasks SET data = json_set(data, {pairs}) WHERE id = ?', (*params, task_id))
+
+    def delete_task(self, task_id):
+        self.connection().execute('DELETE FROM tasks WHERE id = ?', (task_id,))
+
+    def load_tasks(self, tasks, next_id):
+        conn = self.connection()
+        with conn:
+            conn.execute('BEGIN')
+            conn.execute('DELETE FROM tasks')
+            conn.executemany('INSERT INTO tasks (id, data) VALUES (?, ?)', (
+                (task['id'], json.dumps({key: value for key, value in task.items() if key != 'id'}))
+                for task in tasks
+            ))
+            conn.execute("DELETE FROM sqlite_sequence WHERE name = 'tasks'")
+            conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('tasks', ?)", (next_id - 1,))
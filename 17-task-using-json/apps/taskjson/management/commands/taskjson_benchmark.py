@@ -0,0 +1,90 @@
+# apps/taskjson/management/commands/taskjson_benchmark.py
+# python manage.py taskjson_benchmark                                  -> every backend at 1k, 100k and 1M tasks
+# python manage.py taskjson_benchmark --backends journal sqlite --sizes 1000 10000 --ops 50
+#
+# Each backend runs in a scratch MEDIA_ROOT: it is loaded with N tasks (load_tasks), then
+# every operation is timed --ops times (list: --list-ops times, it returns all N tasks):
+#   list, get, create, update, delete
+# and the median and 95th percentile latency are reported in milliseconds.
+import random
+import statistics
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from apps.taskjson.backends import JournalBackend, JsonDocumentBackend, SqliteBackend
+
+BACKENDS = {
+    'document': JsonDocumentBackend,
+    'journal': JournalBackend,
+    'sqlite': SqliteBackend,
+}
+
+
+def sample_tasks(count):
+    return [
+        {'id': n, 'task': f'Task number {n}', 'completed': n % 3 == 0, 'created_at': '2025-12-01T10:00:00'}
+        for n in range(1, count + 1)
+    ]
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Command(BaseCommand):
+    help = 'Compare list / get / create / update / delete latency of the task storage backends.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backends', nargs='+', choices=list(BACKENDS), default=list(BACKENDS))
+        parser.add_argument('--sizes', nargs='+', type=int, default=[1000, 100000, 1000000])
+        parser.add_argument('--ops', type=int, default=20, help='Timed calls per operation.')
+        parser.add_argument('--list-ops', type=int, default=5, help='Timed calls of list (it reads every task).')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'backend':<10}{'tasks':>10}  {'operation':<10}{'median ms':>12}{'p95 ms':>12}")
+        for size in options['sizes']:
+            tasks = sample_tasks(size)
+            for name in options['backends']:
+                with tempfile.TemporaryDirectory() as scratch, override_settings(MEDIA_ROOT=scratch):
+                    results = self.run_backend(BACKENDS[name](), tasks, options)
+                    self.wait_for_compaction()
+                for operation, timings in results.items():
+                    self.stdout.write(
+                        f'{name:<10}{size:>10}  {operation:<10}'
+                        f'{statistics.median(timings) * 1000:>12.3f}{percentile(timings, 0.95) * 1000:>12.3f}'
+                    )
+
+    def run_backend(self, backend, tasks, options):
+        rng = random.Random(options['seed'])
+        ops = options['ops']
+        start = time.perf_counter()
+        backend.load_tasks(tasks, len(tasks) + 1)
+        results = {'load': [time.perf_counter() - start]}
+
+        def timed(operation, call, times):
+            timings = results.setdefault(operation, [])
+            for _ in range(times):
+                start = time.perf_counter()
+                call()
+                timings.append(time.perf_counter() - start)
+
+        ids = [task['id'] for task in tasks]
+        timed('list', backend.list_tasks, options['list_ops'])
+        timed('get', lambda: backend.get_task(rng.choice(ids)), ops)
+        timed('create', lambda: backend.create_task({'task': 'Benchmark', 'completed': False}), ops)
+        timed('update', lambda: backend.update_task(rng.choice(ids), completed=True), ops)
+        doomed = iter(rng.sample(ids, min(ops, len(ids))))
+        timed('delete', lambda: backend.delete_task(next(doomed)), min(ops, len(ids)))
+        return results
+
+    def wait_for_compaction(self):
+        # A journal compaction may still be writing into the scratch directory
+        for thread in threading.enumerate():
+            if thread.name == 'taskjson-compaction':
+                thread.join()
@@ -0,0 +1,371 @@
+# apps/taskjson/store.py
+"""
+Task storage: a compacted snapshot plus an append-only journal.
+
+- media/tasks.json is the snapshot as of the last compaction:
+  {"next_id": 7, "tasks": [...]} (a plain task list is read too).
+- media/tasks.journal.jsonl holds one JSON event per line since then:
+  {"op": "create", "task": {...}}, {"op": "update", "id": 3, "fields": {...}},
+  {"op": "delete", "id": 3}.
+
+Every create / edit / delete is one small append to the journal, whatever
+the number of tasks. read_tasks() replays the journal over the snapshot.
+Once the journal passes TASKJSON_JOURNAL_COMPACT_BYTES, a background
+thread folds it into a new snapshot:
+
+1. the journal is renamed to tasks.journal.compacting (new events go to a
+   fresh journal from then on),
+2. snapshot + compacting journal are replayed into a temporary file,
+3. the temporary file replaces tasks.json and the compacting journal is removed.
+
+Several worker processes can share the store. media/tasks.lock carries
+an fcntl advisory lock: readers take it shared, appends and the file swaps
+of steps 1 and 3 take it exclusive, so a reader always sees either the old
+snapshot with both journals or the new snapshot with the fresh one, and a
+read-modify-write (new ids in add_task) is one critical section. Appends
+and the new snapshot are fsync'ed; the snapshot is written to a temporary
+file and renamed over tasks.json, so a crash never leaves it half written.
+A compacting journal left behind by a crash is replayed by readers and
+finished by the next compaction; a journal line torn by a crash is cut
+off by the next append, and a line that does not decode is skipped.
+"""
+import fcntl
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+
+_lock = threading.RLock()  # This process's threads; also makes locked() re-entrant
+_depth = 0  # locked() nesting in the thread holding _lock
+_compacting = threading.Lock()  # One compaction per process (compaction_path() locks across processes)
+
+
+def snapshot_path():
+    return os.path.join(settings.MEDIA_ROOT, 'tasks.json')
+
+
+def journal_path():
+    return os.path.join(settings.MEDIA_ROOT, 'tasks.journal.jsonl')
+
+
+def compacting_path():
+    return os.path.join(settings.MEDIA_ROOT, 'tasks.journal.compacting')
+
+
+def lock_path():
+    return os.path.join(settings.MEDIA_ROOT, 'tasks.lock')
+
+
+def compaction_lock_path():
+    return os.path.join(settings.MEDIA_ROOT, 'tasks.compaction.lock')
+
+
+@contextmanager
+def locked(shared=False):
+    """
+    Hold the store lock. Nested calls in the same thread are free (an inner
+    shared request inside an exclusive hold keeps the exclusive lock).
+    """
+    global _depth
+    with _lock:
+        if _depth:
+            _depth += 1
+            try:
+                yield
+            finally:
+                _depth -= 1
+            return
+        with open(lock_path(), 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            _depth = 1
+            try:
+                yield
+            finally:
+                _depth = 0
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def fsync_directory(path):
+    # Makes a rename in the directory durable
+    fd = os.open(os.path.dirname(path), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def dump_snapshot(data):
+    """Write `data` to a new fsync'ed temp file next to tasks.json; returns its path, for os.replace()."""
+    path = snapshot_path()
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix='tasks.json.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        os.remove(tmp)
+        raise
+    return tmp
+
+
+def load_snapshot():
+    """(tasks, next_id) from tasks.json: {"next_id": n, "tasks": [...]}, or a plain task list (older files)."""
+    try:
+        with open(snapshot_path()) as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return [], 1
+    if isinstance(data, list):
+        return data, max((task['id'] for task in data), default=0) + 1
+    return data['tasks'], data['next_id']
+
+
+def read_events(path, offset=0):
+    """(events, offset just past the last complete line) reading `path` from `offset`."""
+    try:
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+    except FileNotFoundError:
+        return [], 0
+    events = []
+    for line in data.splitlines(keepends=True):
+        # A torn last line (an append cut short) ends the read; append() cuts it off before writing
+        if not line.endswith(b'\n'):
+            break
+        offset += len(line)
+        try:
+            events.append(json.loads(line))
+        except ValueError:
+            continue  # A damaged line loses its own event, not the ones after it
+    return events, offset
+
+
+def load_events(path):
+    return read_events(path)[0]
+
+
+class TaskIndex:
+    """
+    The replayed store: tasks by id in creation order (a dict, so finding,
+    editing and deleting a task is O(1)) and the next id to hand out. Ids
+    only go up: next_id is saved with every snapshot, so the id of a
+    deleted task is never given out again.
+    """
+
+    def __init__(self, tasks=(), next_id=1):
+        self.by_id = {task['id']: dict(task) for task in tasks}
+        self.next_id = next_id
+
+    def apply(self, events):
+        for event in events:
+            if event['op'] == 'create':
+                task = dict(event['task'])
+                self.by_id[task['id']] = task
+                self.next_id = max(self.next_id, task['id'] + 1)
+            elif event['op'] == 'update' and event['id'] in self.by_id:
+                self.by_id[event['id']].update(event['fields'])
+            elif event['op'] == 'delete':
+                self.by_id.pop(event['id'], None)
+
+    def tasks(self):
+        return list(self.by_id.values())
+
+
+# Per-process cache of parsed files, validated by os.stat(): {path: (signature, value, ...)}
+_files = {}
+_index = {}  # The TaskIndex, what it was built from, and how many journal events it has applied
+
+
+def signature(path):
+    """(st_mtime_ns, st_size, st_ino), or None if the file does not exist."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def cached_snapshot(sig):
+    path = snapshot_path()
+    cached = _files.get(path)
+    if cached is None or cached[0] != sig:
+        cached = (sig, load_snapshot() if sig else ([], 1))
+        _files[path] = cached
+    return cached[1]
+
+
+def cached_events(path, sig):
+    """
+    (events, generation) of a journal file. A journal only grows until it
+    is renamed, so when the same file got longer only the new lines are
+    parsed and the generation stays the same. The first line is compared
+    too: a fresh journal can reuse a deleted file's inode.
+    """
+    cached = _files.get(path)
+    if sig is None:
+        _files.pop(path, None)
+        return [], None
+    if cached is not None and cached[0] == sig:
+        return cached[1], cached[4]
+
+    events, offset, head, generation = [], 0, None, object()
+    if cached is not None and cached[0][2] == sig[2] and sig[1] >= cached[2]:
+        with open(path, 'rb') as f:
+            if f.readline() == cached[3]:
+                events, offset, head, generation = list(cached[1]), cached[2], cached[3], cached[4]
+    new, offset = read_events(path, offset)
+    events += new
+    if head is None:
+        with open(path, 'rb') as f:
+            head = f.readline()
+    _files[path] = (sig, events, offset, head, generation)
+    return events, generation
+
+
+def current_index():
+    """
+    The TaskIndex for the files as they are now; call with the store lock
+    held. Parsed files are kept in memory and re-read only when their
+    (st_mtime_ns, st_size, st_ino) changes, so an unchanged store costs
+    three os.stat() calls, and a write by another process shows up on the
+    next call. When only the journal grew, only its new events are applied.
+    """
+    paths = [snapshot_path(), compacting_path(), journal_path()]
+    sigs = [signature(path) for path in paths]
+    journal, generation = cached_events(paths[2], sigs[2])
+    base = paths + sigs[:2]
+    if _index.get('base') != base or _index.get('generation') is not generation:
+        index = TaskIndex(*cached_snapshot(sigs[0]))
+        index.apply(cached_events(paths[1], sigs[1])[0])
+        _index.update(base=base, generation=generation, applied=0, index=index)
+    _index['index'].apply(journal[_index['applied']:])
+    _index['applied'] = len(journal)
+    return _index['index']
+
+
+def read_tasks():
+    """The current task list, in creation order. Returns copies: callers may change them freely."""
+    with locked(shared=True):
+        return [dict(task) for task in current_index().tasks()]
+
+
+def get_task(task_id):
+    """A copy of the task with this id, or None."""
+    with locked(shared=True):
+        task = current_index().by_id.get(task_id)
+        return dict(task) if task else None
+
+
+def cut_torn_line(f):
+    """
+    Truncate the journal open in `f` back to its last newline. An append
+    cut short (crash, full disk) leaves a partial line; the next event
+    written after it would be glued onto it and never be read.
+    """
+    end = f.seek(0, os.SEEK_END)
+    if not end:
+        return
+    f.seek(end - 1)
+    if f.read(1) == b'\n':
+        return
+    pos = end
+    while pos:
+        step = min(pos, 4096)
+        pos -= step
+        f.seek(pos)
+        newline = f.read(step).rfind(b'\n')
+        if newline >= 0:
+            f.truncate(pos + newline + 1)
+            return
+    f.truncate(0)
+
+
+def append(event):
+    line = (json.dumps(event) + '\n').encode()
+    with locked():
+        with open(journal_path(), 'a+b') as f:
+            cut_torn_line(f)
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+            size = f.tell()
+    if size >= settings.TASKJSON_JOURNAL_COMPACT_BYTES:
+        start_compaction()
+
+
+def add_task(fields):
+    """Give `fields` the next id and store it as a new task. Returns the task."""
+    with locked():
+        task = {**fields, 'id': current_index().next_id}
+        append({'op': 'create', 'task': task})
+    return task
+
+
+def update_task(task_id, **fields):
+    append({'op': 'update', 'id': task_id, 'fields': fields})
+
+
+def delete_task(task_id):
+    append({'op': 'delete', 'id': task_id})
+
+
+@contextmanager
+def compaction_guard(blocking=True):
+    """
+    Be the only compaction, in this process (_compacting) and the others
+    (compaction_lock_path()). Yields False, without waiting, if one is
+    already running and `blocking` is false. Take it before locked().
+    """
+    if not _compacting.acquire(blocking=blocking):
+        yield False
+        return
+    try:
+        with open(compaction_lock_path(), 'a') as guard:
+            try:
+                fcntl.flock(guard, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            except BlockingIOError:
+                yield False
+                return
+            yield True
+    finally:
+        _compacting.release()
+
+
+def compact(wait=False):
+    """
+    Fold the journal into the snapshot. Returns the number of events folded;
+    0 at once if a compaction is already running, unless `wait`.
+    """
+    with compaction_guard(blocking=wait) as guarded:
+        if not guarded:
+            return 0
+        with locked():
+            # A leftover compacting journal (crash) is finished first; new events wait for the next run
+            if not os.path.exists(compacting_path()):
+                if not os.path.exists(journal_path()):
+                    return 0
+                os.replace(journal_path(), compacting_path())
+
+        # Only the compaction writes these two files, and it holds compaction_lock_path()
+        events = load_events(compacting_path())
+        index = TaskIndex(*load_snapshot())
+        index.apply(events)
+        tmp = dump_snapshot({'next_id': index.next_id, 'tasks': index.tasks()})
+        with locked():
+            # Readers never see a partial tasks.json: the new one replaces it whole
+            os.replace(tmp, snapshot_path())
+            os.remove(compacting_path())
+        fsync_directory(snapshot_path())
+        return len(events)
+
+
+def start_compaction():
+    """compact() in a daemon thread, so the request that crossed the threshold does not wait."""
+    thread = threading.Thread(target=compact, name='taskjson-compaction', daemon=True)
+    thread.start()
+    return thread
@@ -1,3 +1,270 @@
-from django.test import TestCase
+# apps/taskjson/tests.py
+# python manage.py test apps.taskjson.tests
+import json
+import os
+import shutil
+import tempfile
+import multiprocessing
+import threading
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import Group, User
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from apps.users.roles import ADMIN
+from . import backends, store
+
+
+def hammer(worker, rounds):
+    # One worker process: adds tasks, completes each one, compacts now and then
+    for n in range(rounds):
+        task = store.add_task({'task': f'{worker}-{n}', 'completed': False})
+        store.update_task(task['id'], completed=True)
+        if n % 10 == 9:
+            store.compact()
+
+
+class TaskStoreTestData:
+
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media)
+        settings = override_settings(MEDIA_ROOT=self.media)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        with open(store.snapshot_path(), 'w') as f:
+            json.dump([{'id': 1, 'task': 'Old', 'completed': False}], f)
+
+
+class TaskStoreTestCase(TaskStoreTestData, TestCase):
+
+    def journal(self):
+        with open(store.journal_path()) as f:
+            return [json.loads(line) for line in f]
+
+    def test_mutations_append_to_the_journal(self):
+        store.add_task({'task': 'New', 'completed': False})
+        store.update_task(1, completed=True)
+        store.delete_task(2)
+        self.assertEqual([event['op'] for event in self.journal()], ['create', 'update', 'delete'])
+        self.assertEqual(store.read_tasks(), [{'id': 1, 'task': 'Old', 'completed': True}])
+        self.assertEqual(store.load_snapshot(), ([{'id': 1, 'task': 'Old', 'completed': False}], 2))
+
+    def test_compaction_folds_the_journal_into_the_snapshot(self):
+        store.add_task({'task': 'New', 'completed': False})
+        store.update_task(2, task='Renamed')
+        before = store.read_tasks()
+        self.assertEqual(store.compact(), 2)
+        self.assertEqual(store.load_snapshot(), (before, 3))
+        self.assertFalse(os.path.exists(store.journal_path()))
+        self.assertFalse(os.path.exists(store.compacting_path()))
+        self.assertEqual(store.read_tasks(), before)
+
+    def test_interrupted_compaction_is_replayed_and_finished(self):
+        store.add_task({'task': 'Before crash', 'completed': False})
+        os.replace(store.journal_path(), store.compacting_path())  # Crash after step 1
+        store.add_task({'task': 'After crash', 'completed': False})
+        expected = [task['task'] for task in store.read_tasks()]
+        self.assertEqual(expected, ['Old', 'Before crash', 'After crash'])
+        self.assertEqual(store.compact(), 1)
+        self.assertEqual([task['task'] for task in store.read_tasks()], expected)
+        self.assertEqual(len(self.journal()), 1)  # The fresh journal waits for the next run
+
+    def test_torn_last_line_is_ignored(self):
+        store.add_task({'task': 'New', 'completed': False})
+        with open(store.journal_path(), 'a') as f:
+            f.write('{"op": "delete", "id"')
+        self.assertEqual(len(store.read_tasks()), 2)
+        # The next append cuts the torn line off instead of writing after it
+        self.assertEqual(store.add_task({'task': 'After the tear', 'completed': False})['id'], 3)
+        self.assertEqual(store.add_task({'task': 'And another', 'completed': False})['id'], 4)
+        self.assertEqual([task['id'] for task in store.read_tasks()], [1, 2, 3, 4])
+        self.assertEqual(store.compact(), 3)
+        self.assertEqual([task['id'] for task in store.read_tasks()], [1, 2, 3, 4])
+
+    def test_damaged_line_does_not_hide_later_events(self):
+        with open(store.journal_path(), 'w') as f:
+            f.write('{"op": "create", "ta\n')
+        store.add_task({'task': 'New', 'completed': False})
+        self.assertEqual([task['task'] for task in store.read_tasks()], ['Old', 'New'])
+
+    @override_settings(TASKJSON_JOURNAL_COMPACT_BYTES=1)
+    def test_threshold_starts_a_background_compaction(self):
+        store.add_task({'task': 'New', 'completed': False})
+        for thread in threading.enumerate():
+            if thread.name == 'taskjson-compaction':
+                thread.join()
+        self.assertEqual(len(store.load_snapshot()[0]), 2)
+        self.assertFalse(os.path.exists(store.compacting_path()))
+
+    def test_ids_are_never_reused(self):
+        second = store.add_task({'task': 'Second', 'completed': False})
+        store.delete_task(second['id'])
+        self.assertEqual(store.add_task({'task': 'Third', 'completed': False})['id'], 3)
+        store.delete_task(3)
+        store.compact()  # The highest ids are gone from the task list, not from next_id
+        self.assertEqual(store.add_task({'task': 'Fourth', 'completed': False})['id'], 4)
+
+    def test_get_task(self):
+        store.update_task(1, completed=True)
+        self.assertEqual(store.get_task(1), {'id': 1, 'task': 'Old', 'completed': True})
+        store.get_task(1)['task'] = 'Changed by a view'
+        self.assertEqual(store.get_task(1)['task'], 'Old')
+        store.delete_task(1)
+        self.assertIsNone(store.get_task(1))
+
+    def test_views_write_through_the_journal(self):
+        user = User.objects.create_user('admin', password='demo')
+        user.groups.add(Group.objects.create(name=ADMIN))
+        self.client.force_login(user)
+        self.client.post(reverse('taskjson:create_task'), {'task': 'From the form'})
+        self.client.post(reverse('taskjson:edit_task', args=[1]), {'task': 'Old', 'completed': 'on'})
+        self.client.get(reverse('taskjson:delete_task', args=[2]))
+        self.assertEqual([event['op'] for event in self.journal()], ['create', 'update', 'delete'])
+        response = self.client.get(reverse('taskjson:index'))
+        self.assertEqual([task['task'] for task in response.context['json_file']], ['Old'])
+
+    def test_unchanged_files_are_not_parsed_again(self):
+        store.add_task({'task': 'New', 'completed': False})
+        store.read_tasks()
+        with mock.patch.object(store, 'load_snapshot') as snapshot, mock.patch.object(store, 'read_events') as events:
+            self.assertEqual(len(store.read_tasks()), 2)
+        snapshot.assert_not_called()
+        events.assert_not_called()
+
+    def test_appended_lines_are_parsed_alone(self):
+        store.add_task({'task': 'New', 'completed': False})
+        store.read_tasks()
+        offset = os.path.getsize(store.journal_path())
+        store.delete_task(1)
+        with mock.patch.object(store, 'read_events', wraps=store.read_events) as events:
+            self.assertEqual([task['id'] for task in store.read_tasks()], [2])
+        events.assert_called_once_with(store.journal_path(), offset)
+
+    def test_write_by_another_process_is_picked_up(self):
+        store.read_tasks()
+        with open(store.snapshot_path(), 'w') as f:
+            json.dump([{'id': 5, 'task': 'Elsewhere', 'completed': False}, {'id': 6, 'task': 'Too', 'completed': True}], f)
+        self.assertEqual([task['id'] for task in store.read_tasks()], [5, 6])
+
+    def test_callers_get_copies(self):
+        store.read_tasks()[0]['task'] = 'Changed by a view'
+        self.assertEqual(store.read_tasks()[0]['task'], 'Old')
+
+
+class TaskStoreConcurrencyTestCase(TaskStoreTestData, SimpleTestCase):
+
+    def test_parallel_workers_lose_no_updates(self):
+        workers, rounds = 4, 50
+        context = multiprocessing.get_context('fork')  # Children inherit the test MEDIA_ROOT
+        processes = [context.Process(target=hammer, args=(worker, rounds)) for worker in range(workers)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        self.assertEqual([process.exitcode for process in processes], [0] * workers)
+
+        tasks = store.read_tasks()
+        self.assertEqual(sorted(task['id'] for task in tasks), list(range(1, workers * rounds + 2)))
+        self.assertEqual(
+            {task['task'] for task in tasks if task['completed']},
+            {f'{worker}-{n}' for worker in range(workers) for n in range(rounds)},
+        )
+        store.compact()
+        self.assertEqual(store.load_snapshot(), (tasks, workers * rounds + 2))
+        self.assertEqual([name for name in os.listdir(self.media) if name.endswith('.tmp')], [])
+
+
+class TaskBackendTestCase(TaskStoreTestData, TestCase):
+    backends = [backends.JsonDocumentBackend, backends.JournalBackend, backends.SqliteBackend]
+
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(self.close_sqlite)
+
+    def close_sqlite(self):
+        for conn in backends._connections.__dict__.pop('by_path', {}).values():
+            conn.close()
+
+    def test_every_backend_keeps_the_same_contract(self):
+        for backend_class in self.backends:
+            with self.subTest(backend=backend_class.__name__):
+                backend = backend_class()
+                backend.load_tasks([{'id': 1, 'task': 'Old', 'completed': False}], 2)
+                new = backend.create_task({'task': 'New', 'completed': False})
+                self.assertEqual(new, {'id': 2, 'task': 'New', 'completed': False})
+                backend.update_task(1, completed=True)
+                self.assertEqual(backend.get_task(1), {'id': 1, 'task': 'Old', 'completed': True})
+                backend.update_task(2, completed=None, **{'due.date': '2025-12-01'})
+                self.assertEqual(backend.get_task(2), {'id': 2, 'task': 'New', 'completed': None, 'due.date': '2025-12-01'})
+                backend.update_task(2, **{'say "hi"': None})
+                self.assertIsNone(backend.get_task(2)['say "hi"'])
+                backend.get_task(1)['task'] = 'Changed by a view'
+                backend.list_tasks()[0]['task'] = 'Changed by a view'
+                backend.delete_task(2)
+                self.assertIsNone(backend.get_task(2))
+                self.assertEqual(backend.create_task({'task': 'Third', 'completed': False})['id'], 3)
+                self.assertEqual(backend.list_tasks(), [
+                    {'id': 1, 'task': 'Old', 'completed': True},
+                    {'id': 3, 'task': 'Third', 'completed': False},
+                ])
+
+    def test_loaded_next_id_is_kept(self):
+        for backend_class in self.backends:
+            with self.subTest(backend=backend_class.__name__):
+                backend = backend_class()
+                backend.load_tasks([{'id': 1, 'task': 'Old', 'completed': False}], 10)
+                self.assertEqual(backend.create_task({'task': 'New', 'completed': False})['id'], 10)
+
+    def test_document_backend_folds_the_journal_first(self):
+        backends.JournalBackend().create_task({'task': 'Journaled', 'completed': False})
+        document = backends.JsonDocumentBackend()
+        self.assertFalse(os.path.exists(store.journal_path()))
+        self.assertEqual([task['task'] for task in document.list_tasks()], ['Old', 'Journaled'])
+        document.update_task(2, completed=True)
+        self.assertTrue(backends.JournalBackend().get_task(2)['completed'])  # And back, nothing replayed
+
+    def test_journal_load_waits_for_a_running_compaction(self):
+        entered, release = threading.Event(), threading.Event()
+
+        def compaction():
+            with store.compaction_guard():
+                entered.set()
+                release.wait()
+
+        holder = threading.Thread(target=compaction)
+        holder.start()
+        entered.wait()
+        loader = threading.Thread(
+            target=backends.JournalBackend().load_tasks, args=([{'id': 7, 'task': 'Loaded', 'completed': False}], 8),
+        )
+        loader.start()
+        loader.join(0.2)
+        self.assertTrue(loader.is_alive())
+        release.set()
+        holder.join()
+        loader.join()
+        self.assertEqual(store.load_snapshot(), ([{'id': 7, 'task': 'Loaded', 'completed': False}], 8))
+
+    @override_settings(TASKJSON_BACKEND='apps.taskjson.backends.SqliteBackend')
+    def test_views_use_the_configured_backend(self):
+        user = User.objects.create_user('admin', password='demo')
+        user.groups.add(Group.objects.create(name=ADMIN))
+        self.client.force_login(user)
+        self.client.post(reverse('taskjson:create_task'), {'task': 'From the form'})
+        self.client.post(reverse('taskjson:edit_task', args=[1]), {'task': 'Renamed', 'completed': 'on'})
+        task = backends.SqliteBackend().get_task(1)
+        self.assertEqual((task['task'], task['completed']), ('Renamed', True))
+        self.assertFalse(os.path.exists(store.journal_path()))
+        response = self.client.get(reverse('taskjson:index'))
+        self.assertEqual([task['task'] for task in response.context['json_file']], ['Renamed'])
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('taskjson_benchmark', '--sizes', '10', '--ops', '2', '--list-ops', '1', stdout=out)
+        lines = out.getvalue().splitlines()[1:]
+        self.assertEqual(len(lines), 3 * 6)  # load, list, get, create, update, delete per backend
+        self.assertEqual(store.read_tasks(), [{'id': 1, 'task': 'Old', 'completed': False}])  # Scratch directory only
@@ -1,36 +1,17 @@
-import json
-import os
 from django.contrib import messages
 from django.shortcuts import render, redirect
-from django.conf import settings
+from apps.users.roles import is_admin, primary_role
 from datetime import datetime
 # from django.utils import timezone
 
-# Define the path to the JSON file
-TASKS_FILE = os.path.join(settings.MEDIA_ROOT, 'tasks.json')
-
-# Ensure the JSON file exists
-if not os.path.exists(TASKS_FILE):
-    with open(TASKS_FILE, 'w') as f:
-        json.dump([], f)  # Initialize with an empty list
-
-# Read tasks from the JSON file
-def read_tasks():
-    with open(TASKS_FILE, 'r') as f:
-        return json.load(f)
-
-# Write tasks to the JSON file
-def write_tasks(tasks):
-    with open(TASKS_FILE, 'w') as f:
-        json.dump(tasks, f, indent=4)
+from .backends import storage  # settings.TASKJSON_BACKEND (apps/taskjson/backends.py)
 
 # Index view to list all tasks
 def index(request):
     # Get logged-in user's primary group
-    user_groups = request.user.groups.values_list('name', flat=True)
-    user_group = user_groups[0] if user_groups else None
+    user_group = primary_role(request.user)
 
-    tasks = read_tasks()  # Get tasks from the JSON file
+    tasks = storage().list_tasks()  # Get tasks from the configured backend
 
     # Format the created_at field for each task
     for task in tasks:
@@ -59,22 +40,19 @@ def index(request):
 # Add new task (Create)
 def create_task(request):
     # Check if the user is in the 'Admin' group
-    if not (request.user.is_superuser or request.user.groups.filter(name='Admin').exists()):
+    if not is_admin(request.user):
         messages.warning(request, "You do not have permission to add tasks.")
         return redirect('taskjson:index')
 
     if request.method == "POST":
         task_name = request.POST.get('task', '')
         if task_name:
-            tasks = read_tasks()
-            new_task = {
-                "id": len(tasks) + 1,  # Increment the ID
+            # The backend gives it its id (several workers may add at once)
+            storage().create_task({
                 "task": task_name,
                 "completed": False,
                 "created_at": datetime.now().isoformat()  # Add creation timestamp
-            }
-            tasks.append(new_task)
-            write_tasks(tasks)
+            })
             return redirect('taskjson:index')  # Redirect to the task list
 
     return render(request, 'taskjson/create_task.html', {
@@ -84,23 +62,22 @@ def create_task(request):
 # Edit an existing task (Update)
 def edit_task(request, task_id):
     # Check if the user is in the 'Admin' group
-    if not (request.user.is_superuser or request.user.groups.filter(name='Admin').exists()):
+    if not is_admin(request.user):
         messages.warning(request, "You do not have permission to edit tasks.")
         return redirect('taskjson:index')
 
-    tasks = read_tasks()
-
-    # Find the task by ID (search manually, not using get_object_or_404)
-    task = next((t for t in tasks if t["id"] == task_id), None)
+    task = storage().get_task(task_id)  # Lookup by id, no scan of the task list
 
     if not task:
         messages.error(request, "Task not found.")
         return redirect('taskjson:index')  # Redirect back to the task list if not found
 
     if request.method == "POST":
-        task['task'] = request.POST.get('task', task['task'])
-        task['completed'] = 'completed' in request.POST  # Mark as completed if checked
-        write_tasks(tasks)
+        storage().update_task(
+            task_id,
+            task=request.POST.get('task', task['task']),
+            completed='completed' in request.POST,  # Mark as completed if checked
+        )
         return redirect('taskjson:index')  # Redirect to the task list
 
     return render(request, 'taskjson/edit_task.html', {
@@ -111,19 +88,15 @@ def edit_task(request, task_id):
 # Delete a specific task (Delete)
 def delete_task(request, task_id):
     # Check if the user is in the 'Admin' group
-    if not (request.user.is_superuser or request.user.groups.filter(name='Admin').exists()):
+    if not is_admin(request.user):
         messages.warning(request, "You do not have permission to delete tasks.")
         return redirect('taskjson:index')
 
-    tasks = read_tasks()
-
-    # Find the task by ID (search manually, not using get_object_or_404)
-    task = next((t for t in tasks if t["id"] == task_id), None)
+    task = storage().get_task(task_id)  # Lookup by id, no scan of the task list
 
     if not task:
         messages.error(request, "Task not found.")
         return redirect('taskjson:index')  # Redirect back to the task list if not found
 
-    tasks.remove(task)  # Remove the task from the list
-    write_tasks(tasks)
+    storage().delete_task(task_id)  # Remove the task from the list
     return redirect('taskjson:index')  # Redirect to the task list
@@ -1,6 +1,7 @@
 # apps/uom/admin.py
 from django.contrib import admin
 from django.contrib.auth.models import Group
+from apps.users.roles import ADMIN, USERS, has_role
 from .models import StockItemUOM
 
 class StockItemUOMAdmin(admin.ModelAdmin):
@@ -15,11 +16,11 @@ class StockItemUOMAdmin(admin.ModelAdmin):
         # Admin group OR Superuser → full access
         if request.user.is_superuser:
             return True
-        if request.user.groups.filter(name='Admin').exists():
+        if has_role(request.user, ADMIN):
             return True
         
         # Users group can VIEW only
-        if request.user.groups.filter(name='Users').exists():
+        if has_role(request.user, USERS):
             return True
 
         return False
@@ -28,27 +29,27 @@ class StockItemUOMAdmin(admin.ModelAdmin):
         # Only Admin group or superuser
         if request.user.is_superuser:
             return True
-        return request.user.groups.filter(name='Admin').exists()
+        return has_role(request.user, ADMIN)
 
     def has_change_permission(self, request, obj=None):
         # Only Admin group or superuser
         if request.user.is_superuser:
             return True
-        return request.user.groups.filter(name='Admin').exists()
+        return has_role(request.user, ADMIN)
 
     def has_delete_permission(self, request, obj=None):
         # Only Admin group or superuser
         if request.user.is_superuser:
             return True
-        return request.user.groups.filter(name='Admin').exists()
+        return has_role(request.user, ADMIN)
 
     def has_module_permission(self, request):
         # Must allow Users + Admins to see the app in Django Admin menu
         if request.user.is_superuser:
             return True
-        if request.user.groups.filter(name='Admin').exists():
+        if has_role(request.user, ADMIN):
             return True
-        if request.user.groups.filter(name='Users').exists():
+        if has_role(request.user, USERS):
             return True
         return False
 
@@ -2,6 +2,7 @@
 from django.contrib import admin
 from django.contrib.auth.models import User, Group
 from django.contrib.auth.admin import UserAdmin
+from .roles import ADMIN, has_role
 
 class CustomUserAdmin(UserAdmin):
 
@@ -13,16 +14,16 @@ class CustomUserAdmin(UserAdmin):
     # Admin group → full access
     # Users group → no access (model hidden)
     def has_view_permission(self, request, obj=None):
-        return request.user.groups.filter(name='Admin').exists() or request.user.is_superuser
+        return has_role(request.user, ADMIN) or request.user.is_superuser
 
     def has_change_permission(self, request, obj=None):
-        return request.user.groups.filter(name='Admin').exists() or request.user.is_superuser
+        return has_role(request.user, ADMIN) or request.user.is_superuser
 
     def has_add_permission(self, request):
-        return request.user.groups.filter(name='Admin').exists() or request.user.is_superuser
+        return has_role(request.user, ADMIN) or request.user.is_superuser
 
     def has_delete_permission(self, request, obj=None):
-        return request.user.groups.filter(name='Admin').exists() or request.user.is_superuser
+        return has_role(request.user, ADMIN) or request.user.is_superuser
 
 # Unregister default User admin
 admin.site.unregister(User)
@@ -0,0 +1,16 @@
+# apps/users/middleware.py
+from .roles import resolve_roles
+
+
+class RolesMiddleware:
+    """
+    Resolve request.user's roles once per request (from the session when
+    the roles version has not changed). Must come after AuthenticationMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.user._roles_cache = resolve_roles(request.user, request.session)
+        return self.get_response(request)
@@ -0,0 +1,94 @@
+# apps/users/roles.py
+"""
+Group-based roles ('Admin', 'Users'), resolved once per request.
+
+RolesMiddleware stores the user's group names in the session together
+with the current roles version, so later requests need no query at all.
+Any change to group membership (or to a group itself) bumps the version
+in the cache (see signals.py), and every session re-reads its groups on
+its next request.
+
+The version lives in the 'shared' cache, which every worker process
+reads. If that cache is process-local (LocMemCache, DummyCache), a bump
+would not reach the other workers, so the roles are not kept in the
+session at all and each request reads the groups (one query).
+"""
+import time
+
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+ADMIN = 'Admin'
+USERS = 'Users'
+
+CACHE_ALIAS = 'shared'
+VERSION_CACHE_KEY = 'users:roles_version'
+SESSION_KEY = '_roles'
+
+
+def version_cache():
+    """The cache holding the roles version, or None if it is not shared between processes."""
+    cache = caches[CACHE_ALIAS]
+    return None if isinstance(cache, (LocMemCache, DummyCache)) else cache
+
+
+def roles_version():
+    cache = version_cache()
+    if cache is None:
+        return None
+    version = cache.get(VERSION_CACHE_KEY)
+    if version is None:
+        # Never restart from a number a session may already hold
+        cache.add(VERSION_CACHE_KEY, time.time_ns(), None)
+        version = cache.get(VERSION_CACHE_KEY)
+    return version
+
+
+def bump_roles_version():
+    cache = version_cache()
+    if cache is not None:
+        cache.set(VERSION_CACHE_KEY, time.time_ns(), None)
+
+
+def resolve_roles(user, session=None):
+    """Tuple of the user's group names, from the session when still current."""
+    if not user.is_authenticated:
+        return ()
+
+    version = roles_version()
+    if version is None:
+        # No shared version to check the session against
+        if session is not None:
+            session.pop(SESSION_KEY, None)
+        session = None
+    cached = session.get(SESSION_KEY) if session is not None else None
+    if cached and cached['user'] == user.pk and cached['version'] == version:
+        return tuple(cached['groups'])
+
+    roles = tuple(user.groups.values_list('name', flat=True))
+    if session is not None:
+        session[SESSION_KEY] = {'user': user.pk, 'version': version, 'groups': list(roles)}
+    return roles
+
+
+def user_roles(user):
+    # Set by RolesMiddleware; resolved here (one query) outside a request
+    if not hasattr(user, '_roles_cache'):
+        user._roles_cache = resolve_roles(user)
+    return user._roles_cache
+
+
+def has_role(user, name):
+    return name in user_roles(user)
+
+
+def is_admin(user):
+    """Superuser or member of the Admin group."""
+    return user.is_superuser or has_role(user, ADMIN)
+
+
+def primary_role(user):
+    """First group name (shown in the list pages), or None."""
+    roles = user_roles(user)
+    return roles[0] if roles else None
@@ -0,0 +1,20 @@
+# apps/users/signals.py
+from django.contrib.auth.models import Group, User
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .roles import bump_roles_version
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def user_groups_changed(sender, action, **kwargs):
+    # user.groups.add/remove/clear/set, or group.user_set.* from the other side
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_roles_version()
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, **kwargs):
+    # A renamed or deleted group changes the role name of every member
+    bump_roles_version()
@@ -1,8 +1,11 @@
 # apps/users/templatetags/group_filters.py
 from django import template
 
+from apps.users.roles import has_role
+
 register = template.Library()
 
 @register.filter
 def in_group(user, group_name):
-    return user.groups.filter(name=group_name).exists()
+    # Roles resolved once per request by RolesMiddleware, no query here
+    return has_role(user, group_name)
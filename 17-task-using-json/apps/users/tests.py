@@ -0,0 +1,64 @@
+# apps/users/tests.py
+# python manage.py test apps.users.tests
+from django.contrib.auth.models import Group, User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .roles import ADMIN, SESSION_KEY, is_admin, primary_role
+from .templatetags.group_filters import in_group
+
+
+class RolesTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admins = Group.objects.create(name=ADMIN)
+        cls.user = User.objects.create_user('user', password='demo')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse('movements:index'))  # Caches the roles in the session
+
+    def request_user(self):
+        return self.client.get(reverse('movements:index')).wsgi_request.user
+
+    def test_roles_come_from_the_session(self):
+        with CaptureQueriesContext(connection) as queries:
+            user = self.request_user()
+        self.assertFalse(any('auth_group' in query['sql'] for query in queries.captured_queries))
+
+        with self.assertNumQueries(0):
+            self.assertFalse(is_admin(user))
+            self.assertFalse(in_group(user, ADMIN))
+            self.assertIsNone(primary_role(user))
+
+    def test_group_change_invalidates_cached_roles(self):
+        self.user.groups.add(self.admins)
+        user = self.request_user()
+        self.assertTrue(is_admin(user))
+        self.assertEqual(primary_role(user), ADMIN)
+        self.assertEqual(self.client.session[SESSION_KEY]['groups'], [ADMIN])
+
+        self.admins.user_set.remove(self.user)  # From the group side
+        self.assertFalse(is_admin(self.request_user()))
+
+    @override_settings(CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    })
+    def test_process_local_cache_keeps_roles_out_of_the_session(self):
+        # Another worker would never see the bump: read the groups on every request
+        self.user.groups.add(self.admins)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(is_admin(self.request_user()))
+        self.assertTrue(any('auth_group' in query['sql'] for query in queries.captured_queries))
+        self.assertNotIn(SESSION_KEY, self.client.session)
+
+    def test_group_rename_invalidates_cached_roles(self):
+        self.user.groups.add(self.admins)
+        self.request_user()
+        self.admins.name = 'Managers'
+        self.admins.save()
+        self.assertFalse(is_admin(self.request_user()))
@@ -0,0 +1,27 @@
+# core/apps.py
+from django.apps import AppConfig, apps
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_migrate, post_save
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'core'
+
+    def ready(self):
+        from .fts import post_migrate_receiver
+        from .registry import STOCK_TABLE_PREFIX
+        from .sqlite import configure_connection
+        from .versions import model_changed
+
+        connection_created.connect(configure_connection, dispatch_uid='core.sqlite.configure_connection')
+
+        # FTS5 tables and their triggers (core/fts.py). core has no models, so Django
+        # sends it no post_migrate of its own: listen to every app's (it is idempotent)
+        post_migrate.connect(post_migrate_receiver, dispatch_uid='core.fts.post_migrate_receiver')
+
+        # Stock list fragments are cached per table version (core/versions.py)
+        for model in apps.get_models():
+            if model._meta.db_table.startswith(STOCK_TABLE_PREFIX):
+                post_save.connect(model_changed, sender=model, dispatch_uid=f'core.versions.{model._meta.label}')
+                post_delete.connect(model_changed, sender=model, dispatch_uid=f'core.versions.{model._meta.label}')
@@ -0,0 +1,96 @@
+# core/choices.py
+"""
+Cached choice lists for the lookup tables in the stock forms.
+
+A CachedModelChoiceField keeps the rows of its queryset in the default
+cache, keyed on the queryset's SQL and the table version from
+core/versions.py, so a post_save / post_delete on the table drops them.
+The version lives in the cache every worker shares, so a change made in
+one worker drops the list in all of them. Rendering the select and
+validating the submitted id both read that list, and
+CachedChoicesFormMixin skips the model's own foreign key check: neither
+GET nor POST queries the lookup table.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.forms import ModelChoiceField
+from django.forms.models import ModelChoiceIterator
+
+from .versions import table_versions
+
+
+def choices_key(queryset):
+    sql = hashlib.md5(str(queryset.query).encode()).hexdigest()
+    return f'choices:{queryset.model._meta.db_table}:{sql}:{table_versions([queryset.model])}'
+
+
+def cached_rows(queryset):
+    """The queryset's rows, from the cache when its table has not changed."""
+    key = choices_key(queryset)
+    rows = cache.get(key)
+    if rows is None:
+        rows = list(queryset)
+        cache.set(key, rows, settings.STOCK_CHOICES_CACHE_TIMEOUT)
+    return rows
+
+
+class CachedModelChoiceIterator(ModelChoiceIterator):
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        for obj in self.field.rows:
+            yield self.choice(obj)
+
+    def __len__(self):
+        return len(self.field.rows) + (self.field.empty_label is not None)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(self.field.rows)
+
+
+class CachedModelChoiceField(ModelChoiceField):
+    iterator = CachedModelChoiceIterator
+
+    def __deepcopy__(self, memo):
+        result = super().__deepcopy__(memo)
+        result.__dict__.pop('_rows', None)  # Each bound form reads the cache afresh
+        return result
+
+    @property
+    def rows(self):
+        # One cache read per form, however often the choices are iterated
+        if not hasattr(self, '_rows'):
+            self._rows = cached_rows(self.queryset)
+        return self._rows
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        if isinstance(value, self.queryset.model):
+            value = getattr(value, self.to_field_name or 'pk')
+        by_key = {str(getattr(obj, self.to_field_name or 'pk')): obj for obj in self.rows}
+        try:
+            return by_key[str(value)]
+        except KeyError:
+            raise ValidationError(
+                self.error_messages['invalid_choice'],
+                code='invalid_choice',
+                params={'value': value},
+            )
+
+
+class CachedChoicesFormMixin:
+    """
+    For ModelForms with CachedModelChoiceFields: the model's full_clean()
+    would check each foreign key again with an EXISTS query. The field has
+    already matched the id against its (narrower) queryset, so skip that.
+    """
+
+    def _get_validation_exclusions(self):
+        exclude = super()._get_validation_exclusions()
+        exclude.update(name for name, field in self.fields.items() if isinstance(field, CachedModelChoiceField))
+        return exclude
@@ -0,0 +1,7 @@
+# core/context_processors.py
+from .registry import stock_tables
+
+
+def stock_table_registry(request):
+    # Cached per process; see core/registry.py
+    return {'tables': stock_tables()}
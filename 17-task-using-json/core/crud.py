@@ -0,0 +1,164 @@
+# core/crud.py
+"""
+Shared class-based CRUD views for the stock modules.
+
+An app declares its views by subclassing these with `model`, `form_class`
+and its labels. The list view joins every forward foreign key with
+select_related() and paginates on the server, so a page costs the same
+few queries whatever the table size. Each list view declares a
+`query_budget`; core/tests.py renders every declared list view and fails
+if a page needs more queries than that.
+
+Templates: <app>/index.html (records, page) and <app>/form.html (form).
+index.html wraps its table in {% cache cache_timeout 'stock_table'
+current_table table_version user_group request.GET.urlencode %}: while
+none of the shown tables changed, the page runs no list query at all.
+"""
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.shortcuts import redirect
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject, cached_property
+from django.views.generic import CreateView, ListView, UpdateView, View
+from django.views.generic.detail import SingleObjectMixin
+
+from apps.users.roles import is_admin, primary_role
+from .versions import table_versions
+
+# Every StockListView subclass, for the query budget test
+LIST_VIEWS = []
+
+
+def related_fields(model):
+    """Names of the model's forward ForeignKey / OneToOne fields."""
+    return [
+        field.name for field in model._meta.concrete_fields
+        if field.is_relation and (field.many_to_one or field.one_to_one)
+    ]
+
+
+class StockViewMixin(LoginRequiredMixin):
+    model = None
+    label = None  # 'UOM' -> "Add UOM", "Update UOM ID 3"
+    noun = None  # 'UOM records' -> "You do not have permission to add UOM records."
+
+    @property
+    def app_name(self):
+        return self.model._meta.app_label
+
+    def get_success_url(self):
+        return reverse(f'{self.app_name}:index')
+
+
+class AdminRequiredMixin:
+    # Users group is view only: add / edit / delete need the Admin role
+    action = None
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.user.is_authenticated and not is_admin(request.user):
+            messages.warning(request, f"You do not have permission to {self.action} {self.noun}.")
+            return redirect(f'{self.app_name}:index')
+        return super().dispatch(request, *args, **kwargs)
+
+
+class StockListView(StockViewMixin, ListView):
+    title = None
+    ordering = ['id']
+    select_related_extra = ()  # Reverse one-to-ones, e.g. ('balance',)
+    query_budget = None  # Max queries per page, session and user included
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        LIST_VIEWS.append(cls)
+
+    def get_template_names(self):
+        return [f'{self.app_name}/index.html']
+
+    def get_paginate_by(self, queryset):
+        return settings.STOCK_PAGE_SIZE
+
+    def get_queryset(self):
+        return super().get_queryset().select_related(*related_fields(self.model), *self.select_related_extra)
+
+    def cache_models(self):
+        """Every model whose rows the table shows: its fragment depends on all their versions."""
+        fields = related_fields(self.model) + list(self.select_related_extra)
+        return [self.model] + [self.model._meta.get_field(name).related_model for name in fields]
+
+    def paginate_queryset(self, queryset, page_size):
+        # Out of range or bad ?page= shows the nearest page instead of a 404
+        paginator = self.get_paginator(queryset, page_size)
+        page = paginator.get_page(self.request.GET.get(self.page_kwarg))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    @cached_property
+    def paginated(self):
+        paginator, page, records, is_paginated = self.paginate_queryset(
+            self.object_list, self.get_paginate_by(self.object_list),
+        )
+        return page, records
+
+    def get_context_data(self, **kwargs):
+        # page and records are lazy: when the template's {% cache %} block hits,
+        # the list is neither counted nor fetched
+        context = {
+            'view': self,
+            'title': self.title,
+            'page': SimpleLazyObject(lambda: self.paginated[0]),
+            'records': SimpleLazyObject(lambda: self.paginated[1]),
+            'current_table': self.model._meta.db_table,
+            'table_version': table_versions(self.cache_models()),
+            'cache_timeout': settings.STOCK_FRAGMENT_CACHE_TIMEOUT,
+            'user_group': primary_role(self.request.user),
+        }
+        context.update(kwargs)
+        return context
+
+
+class StockFormMixin:
+
+    def get_template_names(self):
+        return [f'{self.app_name}/form.html']
+
+    def form_valid(self, form):
+        now = timezone.now()
+        if not form.instance.pk:
+            form.instance.created_at = now
+        form.instance.updated_at = now
+        return super().form_valid(form)
+
+
+class StockCreateView(StockViewMixin, AdminRequiredMixin, StockFormMixin, CreateView):
+    action = 'add'
+
+    def get_context_data(self, **kwargs):
+        return super().get_context_data(title=f'Add {self.label}', **kwargs)
+
+
+class StockUpdateView(StockViewMixin, AdminRequiredMixin, StockFormMixin, UpdateView):
+    action = 'edit'
+
+    def get_context_data(self, **kwargs):
+        return super().get_context_data(title=f'Update {self.label} ID {self.object.pk}', **kwargs)
+
+
+class StockDeleteView(StockViewMixin, AdminRequiredMixin, SingleObjectMixin, View):
+    # Delete links are plain GET links with a JavaScript confirm()
+    action = 'delete'
+
+    def delete_refused(self, record):
+        """Message explaining why `record` cannot be deleted, or None."""
+        return None
+
+    def get(self, request, *args, **kwargs):
+        record = self.get_object()
+        refused = self.delete_refused(record)
+        if refused:
+            messages.warning(request, refused)
+        else:
+            record.delete()
+        return redirect(self.get_success_url())
+
+    post = get
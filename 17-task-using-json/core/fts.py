@@ -0,0 +1,128 @@
+# core/fts.py
+"""
+SQLite FTS5 full-text indexes over the stock tables.
+
+Each index is an external-content FTS5 table: it stores only the token
+index and reads the text back from the stock table by rowid. Triggers on
+the stock table keep it in step with every INSERT / UPDATE / DELETE, raw
+SQL and bulk_create included.
+
+The tables and triggers are created after `migrate` (CoreConfig.ready()
+connects post_migrate_receiver) or by `python manage.py search_index`,
+which can also rebuild them.
+
+A search term becomes one quoted prefix query per word ("bolt"* "m10"*),
+so user input can never be read as FTS5 syntax. Results are ranked with
+bm25(), using the per-column weights declared below.
+"""
+import re
+
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+
+class FullTextIndex:
+
+    def __init__(self, name, table, columns, weights):
+        self.name = name  # FTS5 table
+        self.table = table  # Stock table it indexes (rowid = id)
+        self.columns = columns
+        self.weights = weights  # bm25() weight per column: a match in a heavier column ranks higher
+
+    def create_sql(self):
+        columns = ', '.join(self.columns)
+        new = ', '.join(f'new.{column}' for column in self.columns)
+        old = ', '.join(f'old.{column}' for column in self.columns)
+        insert = f'INSERT INTO {self.name} (rowid, {columns}) VALUES (new.id, {new});'
+        delete = f"INSERT INTO {self.name} ({self.name}, rowid, {columns}) VALUES ('delete', old.id, {old});"
+        return [
+            # prefix='2 3': short prefix queries read a prefix index instead of every matching term
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.name} USING fts5({columns}, "
+            f"content='{self.table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+            f'CREATE TRIGGER IF NOT EXISTS {self.name}_ai AFTER INSERT ON {self.table} BEGIN {insert} END',
+            f'CREATE TRIGGER IF NOT EXISTS {self.name}_ad AFTER DELETE ON {self.table} BEGIN {delete} END',
+            f'CREATE TRIGGER IF NOT EXISTS {self.name}_au AFTER UPDATE OF {columns} ON {self.table} '
+            f'BEGIN {delete} {insert} END',
+        ]
+
+
+ITEMS = FullTextIndex('stock_items_fts', 'stock_items', ('code', 'description'), (10.0, 1.0))
+MOVEMENT_REFERENCES = FullTextIndex('stock_movements_fts', 'stock_movements', ('document_reference',), (1.0,))
+
+FULL_TEXT_INDEXES = [ITEMS, MOVEMENT_REFERENCES]
+
+
+def match_expression(term):
+    """'Hex bolt-M10' -> '"hex"* "bolt"* "m10"*' (every word, as a prefix), or '' if no words."""
+    return ' '.join(f'"{word}"*' for word in re.findall(r'\w+', term.lower()))
+
+
+def create_search_indexes(using='default', rebuild=False):
+    """
+    Create the FTS tables and triggers that are missing, filling new tables
+    from their stock table. Returns the names of the indexes (re)built.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return []
+    tables = set(connection.introspection.table_names())
+    built = []
+    with connection.cursor() as cursor:
+        for index in FULL_TEXT_INDEXES:
+            if index.table not in tables:
+                continue
+            created = index.name not in tables
+            for sql in index.create_sql():
+                cursor.execute(sql)
+            if created or rebuild:
+                cursor.execute(f"INSERT INTO {index.name} ({index.name}) VALUES ('rebuild')")
+                built.append(index.name)
+    return built
+
+
+def post_migrate_receiver(using='default', **kwargs):
+    create_search_indexes(using)
+
+
+def search(index, term, limit=None, using='default'):
+    """Ids of the rows matching `term`, best match first."""
+    expression = match_expression(term)
+    if not expression:
+        return []
+    weights = ', '.join(str(weight) for weight in index.weights)
+    sql = f'SELECT rowid FROM {index.name} WHERE {index.name} MATCH %s ORDER BY bm25({index.name}, {weights})'
+    params = [expression]
+    if limit is not None:
+        sql += ' LIMIT %s'
+        params.append(limit)
+    with connections[using].cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def matching_ids(index, term):
+    """Subquery of the ids matching `term`, for filter(id__in=...); unranked."""
+    return RawSQL(f'SELECT rowid FROM {index.name} WHERE {index.name} MATCH %s', [match_expression(term)])
+
+
+class FullTextSearchAdminMixin:
+    """
+    ModelAdmin search through FTS indexes instead of LIKE '%term%' over
+    search_fields. full_text_search maps a field of the model to the index
+    its ids are matched in, e.g. {'item_id': ITEMS}. Override
+    get_search_filter() to add cheap exact lookups. search_fields stays
+    declared (the search box and autocomplete_fields need it).
+    """
+    full_text_search = {}
+
+    def get_search_filter(self, search_term):
+        condition = Q()
+        for field, index in self.full_text_search.items():
+            condition |= Q(**{f'{field}__in': matching_ids(index, search_term)})
+        return condition
+
+    def get_search_results(self, request, queryset, search_term):
+        if not match_expression(search_term):
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(self.get_search_filter(search_term)), False
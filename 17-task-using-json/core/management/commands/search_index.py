@@ -0,0 +1,19 @@
+# core/management/commands/search_index.py
+# python manage.py search_index [--rebuild]
+from django.core.management.base import BaseCommand
+
+from core.fts import FULL_TEXT_INDEXES, create_search_indexes
+
+
+class Command(BaseCommand):
+    help = 'Create the FTS5 search tables and their triggers if needed (core/fts.py); --rebuild refills them.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help='Re-index every row, not only new tables.')
+
+    def handle(self, *args, **options):
+        built = create_search_indexes(rebuild=options['rebuild'])
+        for index in FULL_TEXT_INDEXES:
+            state = 'built' if index.name in built else 'up to date'
+            self.stdout.write(f'{index.name} ({index.table}: {", ".join(index.columns)}): {state}')
+        self.stdout.write(self.style.SUCCESS('Search indexes ready.'))
@@ -0,0 +1,138 @@
+# core/management/commands/sqlite_benchmark.py
+# python manage.py sqlite_benchmark                          -> 5 s per profile, 4 readers, 2 writers
+# python manage.py sqlite_benchmark --seconds 10 --writers 4
+#
+# Runs the same concurrent workload against a scratch copy of the database,
+# once with SQLite's defaults and once with settings.SQLITE_PRAGMAS:
+#   readers: the movements list page (keyset page, item + doc type joined)
+#   writers: one movement + its balance upsert per transaction (like add_record)
+# Both profiles keep sqlite3's default 5 s lock timeout: a run where the writers fail at
+# once leaves the readers an idle database, and its reads/s say nothing about contention.
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import closing
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.sqlite import apply_pragmas, connection_pragmas
+
+# What a fresh database file gets without any PRAGMA (the copy inherits the source's journal mode)
+SQLITE_DEFAULTS = {'journal_mode': 'DELETE', 'synchronous': 'FULL'}
+
+READ_SQL = '''
+SELECT m.id, m.movement_date, m.quantity, i.code, d.name
+FROM stock_movements m
+JOIN stock_items i ON i.id = m.item_id
+JOIN stock_document_type d ON d.id = m.document_type_id
+ORDER BY m.id DESC
+LIMIT 50
+'''
+
+INSERT_SQL = '''
+INSERT INTO stock_movements
+    (item_id, document_type_id, document_number, quantity, status, movement_date, created_at, updated_at)
+VALUES (?, ?, 0, 1, 1, datetime('now'), datetime('now'), datetime('now'))
+'''
+
+UPSERT_SQL = '''
+INSERT INTO stock_item_balances (item_id, quantity, updated_at) VALUES (?, 1, datetime('now'))
+ON CONFLICT (item_id) DO UPDATE SET quantity = stock_item_balances.quantity + 1
+'''
+
+
+class Command(BaseCommand):
+    help = 'Compare concurrent read/write throughput with and without the SQLite PRAGMA profile.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=5, help='Duration of each run.')
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+
+    def handle(self, *args, **options):
+        database = settings.DATABASES['default']
+        if database['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError('The benchmark needs the SQLite backend.')
+
+        profiles = [('sqlite defaults', SQLITE_DEFAULTS), ('SQLITE_PRAGMAS', connection_pragmas('default'))]
+        self.stdout.write(
+            f"{options['readers']} reader(s), {options['writers']} writer(s), {options['seconds']:g} s per profile"
+        )
+        self.stdout.write(f"{'profile':<18}{'reads/s':>10}{'writes/s':>10}{'locked':>8}")
+
+        with tempfile.TemporaryDirectory() as scratch:
+            for label, pragmas in profiles:
+                path = os.path.join(scratch, f'{label.replace(" ", "_")}.sqlite3')
+                self.copy_database(str(database['NAME']), path)
+                reads, writes, locked = self.run_profile(path, pragmas, options)
+                seconds = options['seconds']
+                self.stdout.write(f'{label:<18}{reads / seconds:>10.0f}{writes / seconds:>10.0f}{locked:>8}')
+
+    def copy_database(self, source, target):
+        with closing(sqlite3.connect(source)) as src, closing(sqlite3.connect(target)) as dst:
+            src.backup(dst)
+
+    def run_profile(self, path, pragmas, options):
+        with closing(sqlite3.connect(path)) as conn:
+            item_ids = [row[0] for row in conn.execute('SELECT id FROM stock_items')]
+            doctype_id = conn.execute('SELECT MIN(id) FROM stock_document_type').fetchone()[0]
+        if not item_ids or doctype_id is None:
+            raise CommandError('The database needs at least one stock item and one document type.')
+
+        counts = {'reads': 0, 'writes': 0, 'locked': 0}
+        lock = threading.Lock()
+        deadline = time.monotonic() + options['seconds']
+
+        def connect():
+            # sqlite3's default 5 s timeout, as Django uses it; a profile's busy_timeout replaces it
+            conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+            apply_pragmas(conn.cursor(), pragmas)
+            return conn
+
+        def reader():
+            conn = connect()
+            done = failed = 0
+            while time.monotonic() < deadline:
+                try:
+                    conn.execute(READ_SQL).fetchall()
+                    done += 1
+                except sqlite3.OperationalError:
+                    failed += 1
+            conn.close()
+            with lock:
+                counts['reads'] += done
+                counts['locked'] += failed
+
+        def writer(offset):
+            conn = connect()
+            done = failed = 0
+            while time.monotonic() < deadline:
+                item_id = item_ids[(done + offset) % len(item_ids)]
+                try:
+                    conn.execute('BEGIN')  # Deferred, as Django's atomic() does
+                    conn.execute(INSERT_SQL, (item_id, doctype_id))
+                    conn.execute(UPSERT_SQL, (item_id,))
+                    conn.execute('COMMIT')
+                    done += 1
+                except sqlite3.OperationalError:
+                    failed += 1
+                    if conn.in_transaction:
+                        conn.execute('ROLLBACK')
+            conn.close()
+            with lock:
+                counts['writes'] += done
+                counts['locked'] += failed
+
+        # Switch the file's journal mode once, before the workers start
+        connect().close()
+
+        threads = [threading.Thread(target=reader) for _ in range(options['readers'])]
+        threads += [threading.Thread(target=writer, args=(n,)) for n in range(options['writers'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return counts['reads'], counts['writes'], counts['locked']
@@ -0,0 +1,31 @@
+# core/registry.py
+"""
+Stock tables shown in the `_table_select.html` dropdown.
+
+Built once per process from the app registry (no database query, so it
+works on any backend): one entry per stock app with a list page, using
+the app's first stock model, e.g. ('stock_items', '/items/').
+Balances, snapshots and archive tables have no page and are left out.
+"""
+from functools import lru_cache
+
+from django.apps import apps
+from django.urls import NoReverseMatch, reverse
+
+STOCK_TABLE_PREFIX = 'stock'
+
+
+@lru_cache(maxsize=None)
+def stock_tables():
+    """((db_table, url), ...) sorted by table name."""
+    tables = {}
+    for model in apps.get_models():
+        label = model._meta.app_label
+        table = model._meta.db_table
+        if not table.startswith(STOCK_TABLE_PREFIX) or label in tables:
+            continue
+        try:
+            tables[label] = (table, reverse(f'{label}:index'))
+        except NoReverseMatch:
+            continue
+    return tuple(sorted(tables.values()))
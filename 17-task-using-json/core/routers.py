@@ -0,0 +1,34 @@
+# core/routers.py
+"""
+Reads go to the read-only 'reader' alias, writes to 'default'.
+
+'reader' opens the same SQLite file with the URI flag mode=ro, through its
+own persistent connections with a larger page cache (settings.DATABASES).
+With WAL, those readers never wait on the writer. Pointing 'reader' at a
+replica later needs no code change.
+
+Inside a transaction on 'default', reads stay on 'default' so they see
+the transaction's own uncommitted writes.
+"""
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+READ_ALIAS = 'reader'
+
+
+class ReadWriteRouter:
+
+    def db_for_read(self, model, **hints):
+        if READ_ALIAS not in settings.DATABASES or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return READ_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases are the same database
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
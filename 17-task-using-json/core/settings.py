@@ -45,6 +45,8 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
 
+    'core',  # SQLite PRAGMA profile, project-wide management commands
+
     'apps.users',
     'apps.uom',
     'apps.categories',
@@ -72,11 +74,13 @@ REST_FRAMEWORK = {
 # Debug Toolbar URLs only if DEBUG=True
 # 'debug_toolbar.middleware.DebugToolbarMiddleware', 
 MIDDLEWARE = [
+    'core.timing.TimingMiddleware',  # Server-Timing header + 'core.timing' log line (sampled), see core/timing.py
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'apps.users.middleware.RolesMiddleware',  # Group roles, once per request (cached in the session)
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -85,7 +89,7 @@ ROOT_URLCONF = 'core.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.timing.TimedDjangoTemplates',  # DjangoTemplates, render time reported to TimingMiddleware
         'DIRS': [BASE_DIR / 'templates'],  # Global templates
         'APP_DIRS': True,
         'OPTIONS': {
@@ -93,6 +97,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'core.context_processors.stock_table_registry',  # {{ tables }} for the table dropdown
             ],
         },
     },
@@ -107,7 +112,44 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    },
+    # Same file, read-only (SQLite URI mode=ro): list, report and API reads, see core/routers.py
+    'reader': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': (BASE_DIR / 'db.sqlite3').as_uri() + '?mode=ro',
+        'CONN_MAX_AGE': None,  # Persistent connections
+        'CONN_HEALTH_CHECKS': True,
+        'PRAGMAS': {
+            'journal_mode': None,  # Set by 'default'; a mode=ro connection cannot change it
+            'cache_size': -262144,  # 256 MB page cache
+        },
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+
+DATABASE_ROUTERS = ['core.routers.ReadWriteRouter']
+
+# SQLite PRAGMAs run on every new connection (core/sqlite.py); DATABASES[alias]['PRAGMAS'] overrides per alias
+SQLITE_PRAGMAS = {
+    'busy_timeout': 5000,  # ms a writer waits for the lock before "database is locked"
+    'journal_mode': 'WAL',  # Readers no longer block on the writer (and vice versa)
+    'synchronous': 'NORMAL',  # fsync at checkpoints only; safe with WAL
+    'cache_size': -65536,  # Negative = KiB: 64 MB page cache per connection
+    'mmap_size': 268435456,  # 256 MB memory-mapped reads
+    'temp_store': 'MEMORY',  # Sorts and temp indexes in memory
+}
+
+# Cache: 'default' (per process) holds rebuildable data; 'shared' holds what every worker must see
+# (the roles version, apps/users/roles.py; the table versions, core/versions.py). Files are shared by the workers of one host; use Redis or
+# Memcached for 'shared' when the workers run on several hosts.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+    },
 }
 
 # Password validation
@@ -161,6 +203,62 @@ LOGIN_REDIRECT_URL = '/movements/'
 LOGOUT_REDIRECT_URL = '/'
 
 
+# Stock list pages (items, categories, uom, doctype): rows per server-side page, see core/crud.py
+STOCK_PAGE_SIZE = 50
+
+# Stock list pages: seconds a rendered table is kept (it is re-rendered as soon as its tables change anyway)
+STOCK_FRAGMENT_CACHE_TIMEOUT = 86400
+
+# Stock forms: seconds a lookup table's choice list is kept (dropped as soon as the table changes)
+STOCK_CHOICES_CACHE_TIMEOUT = 86400
+
+# Item autocomplete (items:autocomplete): max results, and shortest term that also searches the words of code / description
+ITEMS_AUTOCOMPLETE_LIMIT = 20
+ITEMS_AUTOCOMPLETE_MIN_SUBSTRING = 3
+
+# Stock movements list/feed: keyset page size (?size= is capped by the max)
+MOVEMENTS_PAGE_SIZE = 50
+MOVEMENTS_MAX_PAGE_SIZE = 500
+
+# Stock movements bulk posting: max lines per document (keeps the item IN (...) query bounded)
+MOVEMENTS_MAX_POST_LINES = 10000
+
+# Stock movements export: rows fetched per database round-trip while streaming
+MOVEMENTS_EXPORT_CHUNK_SIZE = 2000
+
+# Stock movements archive: `archive_movements` keeps this many months in the hot table (closed periods only)
+MOVEMENTS_ARCHIVE_KEEP_MONTHS = 12
+
+# Excel import of stock movements: rows per transaction, and how many row errors the page lists
+EXCEL_IMPORT_BATCH_SIZE = 1000
+EXCEL_IMPORT_MAX_ERRORS_SHOWN = 500
+
+# Task JSON app storage (apps/taskjson/backends.py): JsonDocumentBackend, JournalBackend or SqliteBackend
+TASKJSON_BACKEND = 'apps.taskjson.backends.JournalBackend'
+
+# Task JSON app (apps/taskjson/store.py): journal size that triggers a background compaction into tasks.json
+TASKJSON_JOURNAL_COMPACT_BYTES = 256 * 1024
+
+# Request timing (core/timing.py): share of requests timed (0.0 - 1.0), and whether to send the Server-Timing header
+REQUEST_TIMING_SAMPLE_RATE = 1.0
+REQUEST_TIMING_HEADER = True
+
+# Timing lines go to the console; Django's own loggers keep their defaults
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.timing': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
+# Stock tables are unmanaged; the test runner creates them in the test database
+TEST_RUNNER = 'core.test_runner.UnmanagedModelTestRunner'
+
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -0,0 +1,37 @@
+# core/sqlite.py
+"""
+SQLite PRAGMA profile applied to every new database connection.
+
+Stock SQLite uses a rollback journal: a writer locks the whole file and
+readers get "database is locked". With WAL, readers keep reading the last
+committed snapshot while one writer appends. synchronous=NORMAL is safe
+in WAL mode (a power cut can lose the last commits, never corrupt), and
+busy_timeout makes a blocked writer wait instead of failing at once.
+
+The profile is settings.SQLITE_PRAGMAS, updated per alias by
+DATABASES[alias]['PRAGMAS']. Compare profiles with:
+python manage.py sqlite_benchmark
+"""
+from django.conf import settings
+from django.db import connections
+
+
+def connection_pragmas(alias):
+    pragmas = dict(settings.SQLITE_PRAGMAS)
+    pragmas.update(connections[alias].settings_dict.get('PRAGMAS', {}))
+    return pragmas
+
+
+def apply_pragmas(cursor, pragmas):
+    """Run PRAGMA name = value for each entry, in order (busy_timeout first). None skips it."""
+    for name, value in pragmas.items():
+        if value is not None:
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def configure_connection(sender, connection, **kwargs):
+    # connection_created receiver, see CoreConfig.ready()
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        apply_pragmas(cursor, connection_pragmas(connection.alias))
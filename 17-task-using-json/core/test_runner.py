@@ -0,0 +1,28 @@
+# core/test_runner.py
+# python manage.py test                 -> every app
+# python manage.py test apps.movements   -> one app
+import logging
+
+from django.apps import apps
+from django.test.runner import DiscoverRunner
+
+
+class UnmanagedModelTestRunner(DiscoverRunner):
+    """
+    The stock tables are `managed = False` (they live in the shipped
+    db.sqlite3), so the test database would not contain them.
+    Flip them to managed for the duration of the test run only.
+    Also quiets the per-request timing log (tests use assertLogs() for it).
+    """
+
+    def setup_test_environment(self, *args, **kwargs):
+        self.unmanaged_models = [m for m in apps.get_models() if not m._meta.managed]
+        for model in self.unmanaged_models:
+            model._meta.managed = True
+        logging.getLogger('core.timing').setLevel(logging.WARNING)
+        super().setup_test_environment(*args, **kwargs)
+
+    def teardown_test_environment(self, *args, **kwargs):
+        super().teardown_test_environment(*args, **kwargs)
+        for model in self.unmanaged_models:
+            model._meta.managed = False
@@ -0,0 +1,324 @@
+# core/tests.py
+# python manage.py test core.tests
+import time
+from io import StringIO
+
+from django.contrib import admin
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.db import connection, connections
+from django.db import transaction
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.categories.models import StockItemCategories
+from apps.doctype.models import StockDocType
+from apps.items.forms import StockItemsForm
+from apps.items.models import StockItems
+from apps.movements.models import StockMovements
+from apps.uom.models import StockItemUOM
+from apps.users.roles import ADMIN
+from . import fts, versions
+from . import urls  # noqa: F401  (imports every app's views, so LIST_VIEWS is complete)
+from .crud import LIST_VIEWS, related_fields
+from .registry import stock_tables
+from .routers import READ_ALIAS, ReadWriteRouter
+from .sqlite import connection_pragmas
+
+
+class StockTableRegistryTestCase(TestCase):
+
+    def test_built_from_stock_models_without_queries(self):
+        stock_tables.cache_clear()
+        with self.assertNumQueries(0):
+            tables = dict(stock_tables())
+
+        self.assertEqual(tables['stock_movements'], reverse('movements:index'))
+        self.assertEqual(tables['stock_items_uom'], reverse('uom:index'))
+        self.assertNotIn('stock_item_balances', tables)  # No list page
+        self.assertIs(stock_tables(), stock_tables())
+
+    def test_index_pages_render_the_dropdown(self):
+        self.client.force_login(User.objects.create_user('user', password='demo'))
+        for name in ['items:index', 'categories:index', 'uom:index', 'doctype:index', 'movements:index']:
+            response = self.client.get(reverse(name))
+            self.assertContains(response, 'data-url="/movements/"')
+
+
+@override_settings(STOCK_PAGE_SIZE=5, MOVEMENTS_PAGE_SIZE=5)
+class CrudQueryBudgetTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        stamps = {'created_at': now, 'updated_at': now}
+        cls.user = User.objects.create_user('admin', password='demo')
+        cls.user.groups.add(Group.objects.create(name=ADMIN))
+
+        # Three pages of everything, every foreign key filled in
+        for n in range(12):
+            uom = StockItemUOM.objects.create(name=f'UOM-{n}', **stamps)
+            category = StockItemCategories.objects.create(name=f'CAT-{n}', **stamps)
+            doctype = StockDocType.objects.create(name=f'DOC-{n}', **stamps)
+            item = StockItems.objects.create(code=f'ITEM-{n}', category=category, uom=uom, **stamps)
+            StockMovements.objects.create(
+                item=item, document_type=doctype, document_number=n, quantity=n, movement_date=now,
+            )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse('movements:index'))  # Caches the user's roles in the session
+
+    def test_every_list_view_has_a_budget(self):
+        self.assertGreaterEqual({view.model._meta.app_label for view in LIST_VIEWS}, {'uom', 'categories', 'doctype', 'items', 'movements'})
+        for view in LIST_VIEWS:
+            self.assertIsNotNone(view.query_budget, view.__name__)
+
+    def test_pages_stay_within_budget(self):
+        for view in LIST_VIEWS:
+            url = reverse(f'{view.model._meta.app_label}:index')
+            for params in [{}, {'page': 2}]:
+                with self.subTest(view=view.__name__, **params), CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(url, params)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.context['records']), 5)
+                self.assertLessEqual(len(queries), view.query_budget, [q['sql'] for q in queries.captured_queries])
+
+    def test_select_related_follows_foreign_keys(self):
+        self.assertEqual(related_fields(StockItems), ['category', 'uom'])
+        self.assertEqual(related_fields(StockMovements), ['item', 'document_type'])
+
+    def test_users_group_cannot_write(self):
+        self.client.force_login(User.objects.create_user('user', password='demo'))
+        uom = StockItemUOM.objects.first()
+        response = self.client.get(reverse('uom:delete', args=[uom.id]))
+        self.assertRedirects(response, reverse('uom:index'))
+        self.assertTrue(StockItemUOM.objects.filter(pk=uom.pk).exists())
+
+
+class TableFragmentCacheTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        cls.user = User.objects.create_user('admin', password='demo')
+        cls.user.groups.add(Group.objects.create(name=ADMIN))
+        cls.uom = StockItemUOM.objects.create(name='PCS', created_at=now, updated_at=now)
+
+    def setUp(self):
+        cache.clear()  # Fragments rendered inside earlier, rolled back tests
+        self.client.force_login(self.user)
+        self.client.get(reverse('uom:index'))  # Roles in the session, table fragment cached
+
+    def list_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('uom:index'))
+        return response, [q['sql'] for q in queries.captured_queries if 'stock_items_uom' in q['sql']]
+
+    def test_unchanged_table_runs_no_list_query(self):
+        response, queries = self.list_queries()
+        self.assertContains(response, 'PCS')
+        self.assertEqual(queries, [])
+
+    def test_save_invalidates_the_fragment(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.uom.name = 'BOX'
+            self.uom.save()
+        response, queries = self.list_queries()
+        self.assertContains(response, 'BOX')
+        self.assertNotContains(response, 'PCS')
+        self.assertTrue(queries)
+
+    def test_bump_by_another_worker_invalidates_the_fragment(self):
+        # Another process: its own connection to the shared cache, a write that sends no signal here
+        other_worker = caches.create_connection(versions.CACHE_ALIAS)
+        StockItemUOM.objects.filter(pk=self.uom.pk).update(name='BOX')
+        response, queries = self.list_queries()
+        self.assertContains(response, 'PCS')  # Not bumped yet: still this process's fragment
+
+        other_worker.set(versions.version_key(StockItemUOM), time.time_ns(), None)
+        response, queries = self.list_queries()
+        self.assertContains(response, 'BOX')
+        self.assertTrue(queries)
+
+    def test_fragment_is_per_role(self):
+        self.client.force_login(User.objects.create_user('user', password='demo'))
+        response, queries = self.list_queries()
+        self.assertNotContains(response, reverse('uom:delete', args=[self.uom.id]))
+        self.assertTrue(queries)
+
+
+class CachedChoicesTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        cls.stamps = {'created_at': now, 'updated_at': now}
+        cls.uom = StockItemUOM.objects.create(name='PCS', **cls.stamps)
+        cls.category = StockItemCategories.objects.create(name='TOOLS', **cls.stamps)
+
+    def setUp(self):
+        cache.clear()
+
+    def form(self, **data):
+        return StockItemsForm(data={
+            'code': 'X-1', 'category': self.category.id, 'uom': self.uom.id, 'status': 1, **data,
+        })
+
+    def lookup_queries(self, action):
+        with CaptureQueriesContext(connection) as queries:
+            action()
+        return [q['sql'] for q in queries.captured_queries if 'stock_items_categories' in q['sql'] or 'stock_items_uom' in q['sql']]
+
+    def test_render_and_validate_from_the_cache(self):
+        self.assertEqual(len(self.lookup_queries(lambda: str(StockItemsForm()))), 2)
+        self.assertEqual(self.lookup_queries(lambda: str(StockItemsForm())), [])
+        form = self.form()
+        self.assertEqual(self.lookup_queries(form.is_valid), [])
+        self.assertEqual(form.cleaned_data['category'], self.category)
+
+    def test_row_deleted_by_another_worker_is_refused(self):
+        str(StockItemsForm())
+        # Another process deletes the row: no signal here, only its bump of the shared version
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM stock_items_categories WHERE id = %s', [self.category.id])
+        caches.create_connection(versions.CACHE_ALIAS).set(
+            versions.version_key(StockItemCategories), time.time_ns(), None,
+        )
+        self.assertNotIn('TOOLS', str(StockItemsForm()['category']))
+        form = self.form()
+        self.assertFalse(form.is_valid())
+        self.assertIn('category', form.errors)
+
+    def test_unknown_or_filtered_out_choice_is_refused(self):
+        inactive = StockItemCategories.objects.create(name='OLD', status=0, **self.stamps)
+        for category in [inactive.id, 9999]:
+            form = self.form(category=category)
+            self.assertFalse(form.is_valid())
+            self.assertIn('category', form.errors)
+
+    def test_save_drops_the_cached_choices(self):
+        str(StockItemsForm())
+        with self.captureOnCommitCallbacks(execute=True):
+            category = StockItemCategories.objects.create(name='PAINT', **self.stamps)
+        self.assertIn('PAINT', str(StockItemsForm()['category']))
+        self.assertTrue(self.form(category=category.id).is_valid())
+
+
+class FullTextSearchTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        stamps = {'created_at': now, 'updated_at': now}
+        cls.bolt = StockItems.objects.create(code='BOLT-10', description='Hex bolt, zinc plated', **stamps)
+        cls.nut = StockItems.objects.create(code='NUT-10', description='Nut for bolt M10', **stamps)
+        doctype = StockDocType.objects.create(name='Receipt', **stamps)
+        cls.movement = StockMovements.objects.create(
+            item=cls.nut, document_type=doctype, document_number=7, quantity=1,
+            document_reference='PO-2024-0815 Müller GmbH', movement_date=now,
+        )
+
+    def test_ranked_and_kept_in_sync_by_triggers(self):
+        self.assertEqual(fts.search(fts.ITEMS, 'bolt'), [self.bolt.id, self.nut.id])  # Code outranks description
+        self.nut.description = 'Nut'
+        self.nut.save()
+        self.assertEqual(fts.search(fts.ITEMS, 'bolt'), [self.bolt.id])
+        self.bolt.delete()
+        self.assertEqual(fts.search(fts.ITEMS, 'bolt'), [])
+
+    def test_terms_are_words_not_syntax(self):
+        self.assertEqual(fts.match_expression('Hex bolt-M10'), '"hex"* "bolt"* "m10"*')
+        self.assertEqual(fts.match_expression('" OR *'), '"or"*')  # A word to look for, not an operator
+        self.assertEqual(fts.match_expression('* - "'), '')
+        self.assertEqual(fts.search(fts.MOVEMENT_REFERENCES, 'mueller'), [])
+        self.assertEqual(fts.search(fts.MOVEMENT_REFERENCES, 'muller 0815'), [self.movement.id])
+
+    def test_admin_search(self):
+        request = RequestFactory().get('/admin/')
+        movements = admin.site._registry[StockMovements]
+        for term in ['po-2024', 'nut', '7', 'receipt']:
+            with self.subTest(term=term):
+                results, distinct = movements.get_search_results(request, StockMovements.objects.all(), term)
+                self.assertEqual(list(results), [self.movement])
+        results, distinct = movements.get_search_results(request, StockMovements.objects.all(), '\u00b2')
+        self.assertEqual(list(results), [])  # A digit to str.isdigit(), not to int()
+        items = admin.site._registry[StockItems]
+        results, distinct = items.get_search_results(request, StockItems.objects.all(), 'zinc')
+        self.assertEqual(list(results), [self.bolt])
+
+    def test_command_rebuilds(self):
+        out = StringIO()
+        call_command('search_index', '--rebuild', stdout=out)
+        self.assertIn('stock_items_fts (stock_items: code, description): built', out.getvalue())
+        self.assertEqual(fts.search(fts.ITEMS, 'zinc'), [self.bolt.id])
+
+
+class RequestTimingTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('user', password='demo')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_header_and_log_line(self):
+        with self.assertLogs('core.timing', 'INFO') as logs, CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('movements:index'))
+        timing = logs.records[0].timing
+        self.assertEqual(timing['url_name'], 'movements:index')
+        self.assertEqual(timing['status'], 200)
+        self.assertEqual(timing['queries'], len(queries))
+        self.assertGreater(timing['template_ms'], 0)
+        self.assertIn('url_name=movements:index ', logs.output[0])
+        self.assertRegex(response['Server-Timing'], rf'^total;dur=[\d.]+, db;dur=[\d.]+;desc="{len(queries)} queries", tpl;dur=[\d.]+$')
+
+    @override_settings(REQUEST_TIMING_HEADER=False)
+    def test_header_can_be_turned_off(self):
+        with self.assertLogs('core.timing', 'INFO'):
+            response = self.client.get(reverse('movements:index'))
+        self.assertNotIn('Server-Timing', response)
+
+    @override_settings(REQUEST_TIMING_SAMPLE_RATE=0.0)
+    def test_unsampled_requests_are_not_timed(self):
+        with self.assertNoLogs('core.timing', 'INFO'):
+            response = self.client.get(reverse('movements:index'))
+        self.assertNotIn('Server-Timing', response)
+
+
+class SqlitePragmasTestCase(TestCase):
+
+    def test_profile_applied_on_connect(self):
+        # The test database connection was opened through connection_created too
+        with connection.cursor() as cursor:
+            for name in ['busy_timeout', 'cache_size', 'synchronous', 'temp_store']:
+                cursor.execute(f'PRAGMA {name}')
+                self.assertEqual(cursor.fetchone()[0], {
+                    'busy_timeout': 5000, 'cache_size': -65536, 'synchronous': 1, 'temp_store': 2,
+                }[name])
+
+    @override_settings(SQLITE_PRAGMAS={'busy_timeout': 100, 'cache_size': -2000})
+    def test_alias_overrides(self):
+        connections['default'].settings_dict['PRAGMAS'] = {'cache_size': -4000}
+        try:
+            self.assertEqual(connection_pragmas('default'), {'busy_timeout': 100, 'cache_size': -4000})
+        finally:
+            del connections['default'].settings_dict['PRAGMAS']
+
+
+class ReadWriteRouterTestCase(SimpleTestCase):
+    databases = {'default'}
+
+    def test_reads_go_to_the_read_only_alias(self):
+        router = ReadWriteRouter()
+        self.assertEqual(router.db_for_read(StockItems), READ_ALIAS)
+        self.assertEqual(router.db_for_write(StockItems), 'default')
+        self.assertFalse(router.allow_migrate(READ_ALIAS, 'items'))
+
+    def test_reads_inside_a_transaction_stay_on_default(self):
+        with transaction.atomic():
+            self.assertEqual(ReadWriteRouter().db_for_read(StockItems), 'default')
@@ -0,0 +1,127 @@
+# core/timing.py
+"""
+Per-request cost: wall time, database time, query count, template time.
+
+TimingMiddleware samples REQUEST_TIMING_SAMPLE_RATE of the requests. For
+a sampled request it
+- counts and times every query with connection.execute_wrapper() on each
+  database alias,
+- times template rendering through the TimedDjangoTemplates backend
+  (TEMPLATES 'BACKEND'), which reports to the request being timed,
+- adds a Server-Timing header (REQUEST_TIMING_HEADER; browsers show it in
+  the network panel) and logs one line to the 'core.timing' logger,
+  tagged with the resolved URL name.
+
+Streaming responses are timed up to the first byte: rows fetched while
+the body streams are not counted.
+"""
+import logging
+import random
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+logger = logging.getLogger('core.timing')
+
+# Timings of the request being handled, None when it is not sampled
+current = ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+
+    def __init__(self):
+        self.db = 0.0
+        self.queries = 0
+        self.template = 0.0
+        self.template_depth = 0  # Only the outermost render counts
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper() hook
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += time.perf_counter() - start
+            self.queries += 1
+
+
+class TimedTemplate(Template):
+
+    def render(self, context=None, request=None):
+        timings = current.get()
+        if timings is None:
+            return super().render(context, request)
+        timings.template_depth += 1
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            timings.template_depth -= 1
+            if not timings.template_depth:
+                timings.template += time.perf_counter() - start
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, with render time reported to TimingMiddleware."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+def milliseconds(seconds):
+    return round(seconds * 1000, 1)
+
+
+class TimingMiddleware:
+    """Put it first in MIDDLEWARE, so the other middleware is timed too."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= settings.REQUEST_TIMING_SAMPLE_RATE:
+            return self.get_response(request)
+
+        timings = RequestTimings()
+        token = current.set(timings)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(timings))
+                response = self.get_response(request)
+        finally:
+            current.reset(token)
+        wall = time.perf_counter() - start
+
+        match = request.resolver_match
+        url_name = match.view_name if match else '-'
+        if settings.REQUEST_TIMING_HEADER:
+            response['Server-Timing'] = ', '.join([
+                f'total;dur={milliseconds(wall)}',
+                f'db;dur={milliseconds(timings.db)};desc="{timings.queries} queries"',
+                f'tpl;dur={milliseconds(timings.template)}',
+            ])
+        fields = {
+            'url_name': url_name,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'wall_ms': milliseconds(wall),
+            'db_ms': milliseconds(timings.db),
+            'queries': timings.queries,
+            'template_ms': milliseconds(timings.template),
+        }
+        logger.info(' '.join(f'{key}={value}' for key, value in fields.items()), extra={'timing': fields})
+        return response
@@ -0,0 +1,55 @@
+# core/versions.py
+"""
+Per-table version numbers for the stock list fragment cache.
+
+Each stock table has a version in the 'shared' cache, which every worker
+process reads. post_save and post_delete on its model bump it, and bump
+it again when the transaction commits (connected in CoreConfig.ready()).
+Writers that bypass model signals (bulk_create, raw SQL) call
+bump_table_versions() themselves.
+
+A list page caches its rendered table under the versions of every table
+it shows (see StockListView.cache_models), so a stale fragment is never
+read again, in any worker. The fragments themselves can stay in each
+process's default cache. Nothing is deleted; old fragments expire on
+their timeout.
+"""
+import time
+
+from django.core.cache import caches
+from django.db import transaction
+
+CACHE_ALIAS = 'shared'
+
+
+def version_key(model):
+    return f'table_version:{model._meta.db_table}'
+
+
+def table_versions(models):
+    """'v1-v2-...' for the given models, one cache round-trip."""
+    cache = caches[CACHE_ALIAS]
+    keys = [version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    if missing:
+        # Never restart from a number an old fragment may be cached under
+        for key, version in missing.items():
+            cache.add(key, version, None)
+        versions.update(cache.get_many(list(missing)))
+    return '-'.join(str(versions[key]) for key in keys)
+
+
+def bump_table_versions(*models, using='default'):
+    """New versions for these tables: now, and again once the transaction commits."""
+    def bump():
+        now = time.time_ns()
+        caches[CACHE_ALIAS].set_many({version_key(model): now for model in models}, None)
+    # A page rendered between the two bumps saw the old rows; the second bump drops it
+    bump()
+    transaction.on_commit(bump, using=using)
+
+
+def model_changed(sender, using='default', **kwargs):
+    # post_save / post_delete receiver
+    bump_table_versions(sender, using=using)
@@ -0,0 +1,51 @@
+# core/widgets.py
+from django import forms
+from django.core.exceptions import ValidationError
+from django.urls import reverse
+
+
+class AutocompleteSelect(forms.Select):
+    """
+    <select> for a ModelChoiceField over a large table. Only the selected
+    option is rendered; static/js/autocomplete.js adds a search box and
+    fills the options from a JSON endpoint ({'results': [{'id', 'text'}]})
+    as the user types. Add {{ form.media }} to the template.
+    """
+
+    class Media:
+        js = ['js/autocomplete.js']
+
+    def __init__(self, url_name, attrs=None):
+        super().__init__(attrs)
+        self.url_name = url_name
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context['widget']['attrs']['data-autocomplete-url'] = reverse(self.url_name)
+        return context
+
+    def valid_keys(self, value):
+        # A re-rendered invalid form carries whatever was posted (item=abc): drop what the key column rejects
+        field = self.choices.field
+        opts = field.queryset.model._meta
+        model_field = opts.get_field(field.to_field_name) if field.to_field_name else opts.pk
+        keys = []
+        for v in value:
+            try:
+                keys.append(model_field.to_python(v))
+            except ValidationError:
+                continue
+        return [key for key in keys if key not in (None, '')]
+
+    def optgroups(self, name, value, attrs=None):
+        field = self.choices.field
+        key = field.to_field_name or 'pk'
+        options = [('', field.empty_label)] if field.empty_label is not None else []
+        options += [
+            (field.prepare_value(obj), field.label_from_instance(obj))
+            for obj in field.queryset.filter(**{f'{key}__in': self.valid_keys(value)})  # One row, not the whole table
+        ]
+        return [
+            (None, [self.create_option(name, option_value, label, str(option_value) in value, index, attrs=attrs)], index)
+            for index, (option_value, label) in enumerate(options)
+        ]
@@ -0,0 +1,47 @@
+// static/js/autocomplete.js (see core/widgets.py AutocompleteSelect)
+document.addEventListener('DOMContentLoaded', function() {
+    document.querySelectorAll('select[data-autocomplete-url]').forEach(function(select) {
+        const search = document.createElement('input');
+        search.type = 'search';
+        search.className = 'form-control form-control-sm mb-1';
+        search.placeholder = 'Search code or description';
+        search.autocomplete = 'off';
+        select.parentNode.insertBefore(search, select);
+
+        let timer = null;
+        search.addEventListener('input', function() {
+            clearTimeout(timer);
+            const term = search.value.trim();
+            if (!term) {
+                return;
+            }
+            // Wait for a pause in typing: one request per search, not per key
+            timer = setTimeout(function() {
+                const url = select.dataset.autocompleteUrl + '?q=' + encodeURIComponent(term);
+                fetch(url, {headers: {'Accept': 'application/json'}})
+                    .then(function(response) { return response.json(); })
+                    .then(function(data) {
+                        const current = select.value;
+                        const chosen = current ? select.options[select.selectedIndex] : null;
+                        const empty = select.querySelector('option[value=""]');
+                        select.innerHTML = '';
+                        if (empty) {
+                            select.appendChild(empty);
+                        }
+                        // The item picked so far stays picked: a search alone never changes the choice
+                        if (chosen && !data.results.some(function(result) { return String(result.id) === current; })) {
+                            select.appendChild(chosen);
+                        }
+                        data.results.forEach(function(result) {
+                            select.appendChild(new Option(result.text, result.id));
+                        });
+                        if (current) {
+                            select.value = current;
+                        } else {
+                            select.selectedIndex = empty ? 0 : -1;
+                        }
+                    });
+            }, 250);
+        });
+    });
+});
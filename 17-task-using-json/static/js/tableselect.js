@@ -5,6 +5,13 @@ document.addEventListener('DOMContentLoaded', function() {
         tableSelect.addEventListener('change', function() {
             const selectedTable = this.value;
 
+            // Options rendered from the stock table registry carry their own URL
+            const url = this.selectedOptions[0].dataset.url;
+            if (url) {
+                window.location.href = url;
+                return;
+            }
+
             switch (selectedTable) {
                 case 'stock_items_categories':
                     window.location.href = '/categories/';